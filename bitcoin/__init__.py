@@ -44,7 +44,8 @@ from .transaction import (
     TransactionOutput,
     Transaction,
     UTXOSet,
-    AddressValidator
+    AddressValidator,
+    verify_block_signatures
 )
 
 # 导入区块链相关类（包含Block和Blockchain）
@@ -87,6 +88,7 @@ __all__ = [
     'Transaction',
     'UTXOSet',
     'AddressValidator',
+    'verify_block_signatures',
     'Block',
     'Blockchain',
     'UTXOFilter',
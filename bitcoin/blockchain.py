@@ -862,7 +862,7 @@ class Blockchain:
             if current_block.hash[:self.difficulty] != "0" * self.difficulty:
                 return False
 
-            # 验证区块中的交易（仅基本格式验证，不验证UTXO状态）
+            # 验证区块中的交易
             for tx_data in current_block.transactions:
                 try:
                     transaction = Transaction.from_dict(tx_data)
@@ -894,7 +894,8 @@ class Blockchain:
             "difficulty": self.difficulty,
             "pending_transactions": [tx.to_dict() for tx in self.pending_transactions],
             "mining_reward": self.mining_reward,
-            "utxo_set": {utxo_id: utxo.to_dict() for utxo_id, utxo in self.utxo_set.utxos.items()}
+            "utxo_set": {UTXOSet.utxo_id_to_str(utxo_id): utxo.to_dict()
+                         for utxo_id, utxo in self.utxo_set.utxos.items()}
         }
 
     def save_to_file(self, filename: str) -> None:
@@ -930,7 +931,7 @@ class Blockchain:
                 for utxo_id, utxo_data in data['utxo_set'].items():
                     from .transaction import UTXO
                     utxo = UTXO.from_dict(utxo_data)
-                    blockchain.utxo_set.utxos[utxo_id] = utxo
+                    blockchain.utxo_set.utxos[UTXOSet.utxo_id_from_str(utxo_id)] = utxo
 
             return blockchain
         except Exception as e:
@@ -22,11 +22,12 @@ import json
 import time
 import random
 import threading
+from concurrent.futures import Executor
 from typing import List, Optional, Dict, Any
 
 # 使用相对导入避免循环导入
 from .wallet import Wallet
-from .transaction import Transaction
+from .transaction import Transaction, verify_block_signatures
 from .blockchain import Blockchain
 from .config import NETWORK_DELAY, DEFAULT_TRANSACTION_FEE
 
@@ -34,15 +35,21 @@ from .config import NETWORK_DELAY, DEFAULT_TRANSACTION_FEE
 class NetworkNode:
     """网络节点类 - 模拟分布式账本中的单个节点"""
 
-    def __init__(self, node_id: str, difficulty: int = 3, mining_reward: float = 50):
+    def __init__(self, node_id: str, difficulty: int = 3, mining_reward: float = 50,
+                 verify_signatures: bool = False,
+                 signature_executor: Optional[Executor] = None):
         """
         初始化网络节点
         Args:
             node_id: 节点唯一标识
             difficulty: 挖矿难度
             mining_reward: 挖矿奖励
+            verify_signatures: 接收区块时是否验证其中所有交易输入的签名
+            signature_executor: 并行验证签名的执行器（可选，由调用方创建并关闭）
         """
         self.node_id = node_id
+        self.verify_signatures = verify_signatures
+        self.signature_executor = signature_executor
         self.blockchain = Blockchain(difficulty, mining_reward)
         self.peers: Dict[str, 'NetworkNode'] = {}  # 连接的对等节点
         self.is_mining = False
@@ -160,6 +167,11 @@ class NetworkNode:
             latest_block = self.blockchain.get_latest_block()
             if block.previous_hash != latest_block.hash:
                 return False
+        # 签名验证（可选）
+        if self.verify_signatures:
+            transactions = [Transaction.from_dict(tx_data) for tx_data in block.transactions]
+            if not verify_block_signatures(transactions, executor=self.signature_executor):
+                return False
         return True
 
     def _remove_processed_transactions(self, transactions: List[Dict]) -> None:
@@ -5,23 +5,32 @@
 包含交易相关的所有类和功能：UTXO、交易输入输出、交易本身和UTXO集合管理
 """
 
-import json
+import hashlib
+import os
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Executor
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Tuple, Union
 
-from .config import DEFAULT_TRANSACTION_FEE
+import base58
+
+from .config import BITCOIN_ADDRESS_VERSION, DEFAULT_TRANSACTION_FEE
 from .utils import HashUtils
 
 
 class UTXO:
     """未花费交易输出 (Unspent Transaction Output)"""
 
+    __slots__ = ('transaction_id', 'output_index', 'amount', 'recipient_address',
+                 'is_spent', '_hash160')
+
     def __init__(
         self,
         transaction_id: str,
         output_index: int,
         amount: float,
-        recipient_address: str
+        recipient_address: str,
+        hash160: Optional[bytes] = None
     ):
         """
         初始化UTXO
@@ -30,16 +39,27 @@ class UTXO:
             output_index: 输出索引
             amount: 金额
             recipient_address: 接收地址
+            hash160: 接收地址对应的公钥哈希（可选，未提供时在首次验证输入时解码）
         """
         self.transaction_id = transaction_id
         self.output_index = output_index
         self.amount = amount
         self.recipient_address = recipient_address
         self.is_spent = False  # 是否已花费
+        # False 表示尚未解码（None 表示地址无效），复制/序列化后仍可识别
+        self._hash160 = False if hash160 is None else hash160
+
+    @property
+    def hash160(self) -> Optional[bytes]:
+        """接收地址的HASH160（首次读取时解码并缓存，地址无效时为None）"""
+        value = self._hash160
+        if value is False:
+            value = self._hash160 = AddressValidator.hash160_from_address(self.recipient_address)
+        return value
 
-    def get_utxo_id(self) -> str:
-        """获取UTXO的唯一标识符"""
-        return f"{self.transaction_id}:{self.output_index}"
+    def get_utxo_id(self) -> Tuple[str, int]:
+        """获取UTXO的唯一标识符 (交易ID, 输出索引)"""
+        return (self.transaction_id, self.output_index)
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -67,6 +87,8 @@ class UTXO:
 class TransactionInput:
     """交易输入"""
 
+    __slots__ = ('transaction_id', 'output_index', 'signature', 'public_key')
+
     def __init__(
         self,
         transaction_id: str,
@@ -87,9 +109,9 @@ class TransactionInput:
         self.signature = signature
         self.public_key = public_key
 
-    def get_utxo_id(self) -> str:
-        """获取引用的UTXO ID"""
-        return f"{self.transaction_id}:{self.output_index}"
+    def get_utxo_id(self) -> Tuple[str, int]:
+        """获取引用的UTXO ID (交易ID, 输出索引)"""
+        return (self.transaction_id, self.output_index)
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -114,6 +136,8 @@ class TransactionInput:
 class TransactionOutput:
     """交易输出"""
 
+    __slots__ = ('amount', 'recipient_address')
+
     def __init__(self, amount: float, recipient_address: str):
         """
         初始化交易输出
@@ -141,7 +165,43 @@ class TransactionOutput:
 
 
 class AddressValidator:
-    """地址验证工具类 - 避免重复创建钱包实例"""
+    """
+    地址验证工具类 - 避免重复创建钱包实例
+    注意：地址、公钥哈希、交易ID均为公开数据，比较时直接使用 ==（允许提前返回），
+    不要使用 hmac.compare_digest 等恒定时间比较，后者只适用于秘密数据
+    """
+
+    @staticmethod
+    def hash160_from_public_key(public_key_hex: str) -> Optional[bytes]:
+        """
+        计算公钥的HASH160（RIPEMD160(SHA256(pubkey))），不做版本和Base58编码
+        Args:
+            public_key_hex: 公钥16进制字符串
+        Returns:
+            bytes: 20字节公钥哈希，公钥无效时返回None
+        """
+        try:
+            sha256_hash = hashlib.sha256(bytes.fromhex(public_key_hex)).digest()
+            return hashlib.new('ripemd160', sha256_hash).digest()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def hash160_from_address(address: str) -> Optional[bytes]:
+        """
+        从Base58Check地址中解析出HASH160
+        Args:
+            address: 地址
+        Returns:
+            bytes: 20字节公钥哈希，地址无效时返回None
+        """
+        try:
+            decoded = base58.b58decode_check(address)
+        except ValueError:
+            return None
+        if len(decoded) != 21 or decoded[:1] != BITCOIN_ADDRESS_VERSION:
+            return None
+        return decoded[1:]
 
     @staticmethod
     def derive_address_from_public_key(public_key_hex: str) -> str:
@@ -153,10 +213,6 @@ class AddressValidator:
             str: 派生的地址
         """
         try:
-            import base58
-            import hashlib
-            from .config import BITCOIN_ADDRESS_VERSION
-
             public_key_bytes = bytes.fromhex(public_key_hex)
 
             # 1. 对公钥进行SHA256哈希
@@ -167,20 +223,53 @@ class AddressValidator:
             hash160 = ripemd160.digest()
             # 3. 添加版本字节
             versioned_payload = BITCOIN_ADDRESS_VERSION + hash160
-            # 4. 计算校验和
-            checksum = hashlib.sha256(hashlib.sha256(versioned_payload).digest()).digest()[:4]
-            # 5. 组合并Base58编码
-            binary_address = versioned_payload + checksum
-            return base58.b58encode(binary_address).decode('utf-8')
+            # 4. Base58Check编码（校验和与编码一次完成）
+            return base58.b58encode_check(versioned_payload).decode('utf-8')
         except Exception:
             return ""
 
     @staticmethod
-    def verify_signature_static(message: str, signature_hex: str, public_key_hex: str) -> bool:
+    def derive_addresses(public_keys_hex: List[str]) -> List[str]:
+        """
+        批量从公钥派生地址（批量验证区块/交易时使用）
+        每个阶段在一个循环中完成，重复的公钥只计算一次
+        Args:
+            public_keys_hex: 公钥16进制字符串列表
+        Returns:
+            List[str]: 与输入顺序一致的地址列表，无效公钥对应空字符串
+        """
+        unique_keys = list(dict.fromkeys(public_keys_hex))
+
+        # 1. 解码公钥并批量计算SHA256
+        sha256_hashes = []
+        for public_key_hex in unique_keys:
+            try:
+                sha256_hashes.append(hashlib.sha256(bytes.fromhex(public_key_hex)).digest())
+            except ValueError:
+                sha256_hashes.append(None)
+
+        # 2. 批量计算RIPEMD160并添加版本字节
+        versioned_payloads = [
+            BITCOIN_ADDRESS_VERSION + hashlib.new('ripemd160', digest).digest()
+            if digest is not None else None
+            for digest in sha256_hashes
+        ]
+
+        # 3. 批量Base58Check编码
+        addresses = {
+            public_key_hex: base58.b58encode_check(payload).decode('utf-8')
+            if payload is not None else ""
+            for public_key_hex, payload in zip(unique_keys, versioned_payloads)
+        }
+        return [addresses[public_key_hex] for public_key_hex in public_keys_hex]
+
+    @staticmethod
+    def verify_signature_static(message: Union[str, bytes], signature_hex: str,
+                                public_key_hex: str) -> bool:
         """
         静态方法验证数字签名（避免创建钱包实例）
         Args:
-            message: 原始消息
+            message: 原始消息（字符串或字节）
             signature_hex: 签名16进制字符串
             public_key_hex: 公钥16进制字符串
         Returns:
@@ -190,7 +279,7 @@ class AddressValidator:
             from ecdsa import VerifyingKey, SECP256k1
             from ecdsa.util import sigdecode_string
 
-            message_bytes = message.encode('utf-8')
+            message_bytes = message.encode('utf-8') if isinstance(message, str) else message
             signature_bytes = bytes.fromhex(signature_hex)
             public_key_bytes = bytes.fromhex(public_key_hex)
 
@@ -203,6 +292,9 @@ class AddressValidator:
 class Transaction:
     """交易类 - 支持UTXO模型"""
 
+    __slots__ = ('inputs', 'outputs', 'timestamp', 'block_height', '_transaction_id',
+                 '_is_coinbase_cache', '_total_out_cache')
+
     def __init__(self, inputs: List[TransactionInput] = None,
                  outputs: List[TransactionOutput] = None,
                  block_height: Optional[int] = None):
@@ -217,7 +309,22 @@ class Transaction:
         self.outputs = outputs or []
         self.timestamp = str(int(time.time()))
         self.block_height = block_height
-        self.transaction_id = self._calculate_hash()
+        # 交易构造后视为不可变，缓存重复查询的结果
+        self._is_coinbase_cache: Optional[bool] = None
+        self._total_out_cache: Optional[float] = None
+        # 交易ID延迟到首次访问时计算
+        self._transaction_id: Optional[str] = None
+
+    @property
+    def transaction_id(self) -> str:
+        """交易ID（首次访问时计算并缓存）"""
+        if self._transaction_id is None:
+            self._transaction_id = self._calculate_hash()
+        return self._transaction_id
+
+    @transaction_id.setter
+    def transaction_id(self, value: str) -> None:
+        self._transaction_id = value
 
     def is_coinbase(self) -> bool:
         """
@@ -225,10 +332,13 @@ class Transaction:
         Returns:
             bool: 是否为coinbase交易
         """
-        # Coinbase交易没有输入，或者输入的transaction_id为空
-        if not self.inputs:
-            return True
-        return all(not input_tx.transaction_id for input_tx in self.inputs)
+        if self._is_coinbase_cache is None:
+            # Coinbase交易没有输入，或者输入的transaction_id为空
+            self._is_coinbase_cache = (
+                not self.inputs or
+                all(not input_tx.transaction_id for input_tx in self.inputs)
+            )
+        return self._is_coinbase_cache
 
     def calculate_fee(self, utxo_set) -> float:
         """
@@ -270,7 +380,9 @@ class Transaction:
         Returns:
             float: 输出总金额
         """
-        return sum(output.amount for output in self.outputs)
+        if self._total_out_cache is None:
+            self._total_out_cache = sum(output.amount for output in self.outputs)
+        return self._total_out_cache
 
     def get_input_addresses(self, utxo_set) -> List[str]:
         """
@@ -301,8 +413,8 @@ class Transaction:
         transaction_data = self.get_transaction_data_for_signature()
         return HashUtils.calculate_transaction_hash(transaction_data)
 
-    def get_transaction_data_for_signature(self) -> str:
-        """获取用于签名的交易数据"""
+    def get_transaction_data_for_signature(self) -> bytes:
+        """获取用于签名的交易数据（规范化字节串）"""
         data = {"inputs": [{"transaction_id": inp.transaction_id,
                             "output_index": inp.output_index} for inp in self.inputs],
                 "outputs": [out.to_dict() for out in self.outputs],
@@ -312,7 +424,7 @@ class Transaction:
         if self.is_coinbase() and self.block_height is not None:
             data["block_height"] = self.block_height
 
-        return json.dumps(data, sort_keys=True)
+        return HashUtils.canonical_bytes(data)
 
     def sign_transaction(self, wallet, utxo_set=None) -> None:
         """
@@ -324,27 +436,33 @@ class Transaction:
         if self.is_coinbase():
             return  # Coinbase交易不需要签名
 
-        # 为每个输入单独签名（更符合比特币的实际做法）
-        for i, input_tx in enumerate(self.inputs):
-            # 创建该输入的签名数据
-            input_data = self._get_input_signature_data(i)
-            signature = wallet.sign_message(input_data)
+        # 交易的规范化数据只序列化一次，各输入在其后追加索引
+        base_data = self.get_transaction_data_for_signature()
 
-            # 设置签名和公钥
+        # 为每个输入单独签名（更符合比特币的实际做法），先构造全部签名数据再批量签名
+        input_data = [self._get_input_signature_data(i, base_data)
+                      for i in range(len(self.inputs))]
+        signatures = wallet.sign_messages(input_data)
+
+        # 设置签名和公钥
+        for input_tx, signature in zip(self.inputs, signatures):
             input_tx.signature = signature
             input_tx.public_key = wallet.public_key_hex
 
-    def _get_input_signature_data(self, input_index: int) -> str:
+    def _get_input_signature_data(self, input_index: int,
+                                  base_data: Optional[bytes] = None) -> bytes:
         """
         获取特定输入的签名数据
         Args:
             input_index: 输入索引
+            base_data: 预先计算的交易签名数据（可选，避免重复序列化）
         Returns:
-            str: 签名数据
+            bytes: 签名数据
         """
         # 简化版本：包含交易基本数据和输入索引
-        base_data = self.get_transaction_data_for_signature()
-        return f"{base_data}:input_{input_index}"
+        if base_data is None:
+            base_data = self.get_transaction_data_for_signature()
+        return base_data + b":input_" + str(input_index).encode()
 
     def verify_signature(self, utxo_set=None) -> bool:
         """
@@ -357,28 +475,53 @@ class Transaction:
         if self.is_coinbase():
             return True  # Coinbase交易无需验证签名
 
+        # 需要完整地址派生的输入一次性批量计算
+        derived_addresses = self._derive_fallback_addresses(utxo_set) if utxo_set else {}
+        base_data = self.get_transaction_data_for_signature()
+
         for i, input_tx in enumerate(self.inputs):
             if not input_tx.signature or not input_tx.public_key:
                 return False
 
             # 验证公钥对应的地址是否正确
-            if utxo_set and not self._verify_input_address(input_tx, utxo_set):
+            if utxo_set and not self._verify_input_address(
+                    input_tx, utxo_set, derived_addresses):
                 return False
 
             # 验证签名
-            input_data = self._get_input_signature_data(i)
+            input_data = self._get_input_signature_data(i, base_data)
             if not AddressValidator.verify_signature_static(
                     input_data, input_tx.signature, input_tx.public_key):
                 return False
 
         return True
 
-    def _verify_input_address(self, input_tx: TransactionInput, utxo_set) -> bool:
+    def _derive_fallback_addresses(self, utxo_set) -> Dict[str, str]:
+        """
+        为接收地址无法解码出HASH160的UTXO对应输入批量派生地址
+        Args:
+            utxo_set: UTXO集合
+        Returns:
+            Dict[str, str]: 公钥16进制字符串 -> 地址
+        """
+        public_keys = []
+        for input_tx in self.inputs:
+            utxo = utxo_set.get_utxo(input_tx.get_utxo_id())
+            if utxo is not None and utxo.hash160 is None and input_tx.public_key:
+                public_keys.append(input_tx.public_key)
+
+        if not public_keys:
+            return {}
+        return dict(zip(public_keys, AddressValidator.derive_addresses(public_keys)))
+
+    def _verify_input_address(self, input_tx: TransactionInput, utxo_set,
+                              derived_addresses: Optional[Dict[str, str]] = None) -> bool:
         """
         验证输入的地址是否匹配公钥
         Args:
             input_tx: 交易输入
             utxo_set: UTXO集合
+            derived_addresses: 预先批量派生的地址（可选）
         Returns:
             bool: 是否匹配
         """
@@ -387,11 +530,18 @@ class Transaction:
             return False
 
         utxo = utxo_set[utxo_id]
-        expected_address = utxo.recipient_address
 
-        # 使用优化的地址验证方法
-        derived_address = AddressValidator.derive_address_from_public_key(input_tx.public_key)
-        return derived_address == expected_address
+        # 优先比较20字节的HASH160，跳过版本、校验和与Base58编码
+        # （公开数据，使用普通的字节串 == 比较）
+        if utxo.hash160 is not None:
+            return AddressValidator.hash160_from_public_key(input_tx.public_key) == utxo.hash160
+
+        # 接收地址无法解码出HASH160时回退到完整地址派生
+        if derived_addresses and input_tx.public_key in derived_addresses:
+            derived_address = derived_addresses[input_tx.public_key]
+        else:
+            derived_address = AddressValidator.derive_address_from_public_key(input_tx.public_key)
+        return derived_address == utxo.recipient_address
 
     def is_valid(self, utxo_set=None) -> bool:
         """
@@ -485,7 +635,7 @@ class Transaction:
 
         # 恢复其他属性
         transaction.timestamp = data['timestamp']
-        transaction.transaction_id = data['transaction_id']
+        transaction._transaction_id = data['transaction_id']
 
         return transaction
 
@@ -520,24 +670,83 @@ class Transaction:
             return f"交易 {self.transaction_id[:8]}... - {input_count}输入→{output_count}输出: {total_output} BTC"
 
 
+# 签名数量低于该阈值时串行验证，避免进程池的调度开销
+PARALLEL_VERIFY_THRESHOLD = 64
+
+
+def _verify_one(item: Tuple[bytes, str, str]) -> bool:
+    """验证单个(消息, 签名, 公钥)三元组（进程池工作函数）"""
+    message, signature_hex, public_key_hex = item
+    return AddressValidator.verify_signature_static(message, signature_hex, public_key_hex)
+
+
+def verify_block_signatures(transactions: List[Transaction], utxo_set=None,
+                            executor: Optional[Executor] = None) -> bool:
+    """
+    验证一批交易（如一个区块）中所有输入的签名
+    纯Python的ecdsa验证不会释放GIL，并行验证应传入进程池（ProcessPoolExecutor）；
+    进程池由调用方创建并负责关闭，可在多次验证间复用
+    Args:
+        transactions: 交易列表
+        utxo_set: UTXO集合（可选，提供时同时验证输入地址）
+        executor: 用于并行验证的执行器（可选，不提供或签名较少时串行验证）
+    Returns:
+        bool: 所有签名是否有效
+    """
+    items = []
+    for transaction in transactions:
+        if transaction.is_coinbase():
+            continue
+
+        derived_addresses = transaction._derive_fallback_addresses(utxo_set) if utxo_set else {}
+        base_data = transaction.get_transaction_data_for_signature()
+        for i, input_tx in enumerate(transaction.inputs):
+            if not input_tx.signature or not input_tx.public_key:
+                return False
+            # 地址检查开销很小，在主进程中完成
+            if utxo_set and not transaction._verify_input_address(
+                    input_tx, utxo_set, derived_addresses):
+                return False
+            items.append((transaction._get_input_signature_data(i, base_data),
+                          input_tx.signature, input_tx.public_key))
+
+    if executor is None or len(items) < PARALLEL_VERIFY_THRESHOLD:
+        return all(_verify_one(item) for item in items)
+
+    chunksize = max(1, len(items) // ((os.cpu_count() or 1) * 4))
+    return all(executor.map(_verify_one, items, chunksize=chunksize))
+
+
 class UTXOSet:
     """UTXO集合管理类"""
 
     def __init__(self):
         """初始化UTXO集合"""
-        self.utxos: Dict[str, UTXO] = {}
+        # 以 (交易ID, 输出索引) 元组为键，避免每次查找都格式化字符串
+        self.utxos: Dict[Tuple[str, int], UTXO] = {}
+
+    @staticmethod
+    def utxo_id_to_str(utxo_id: Tuple[str, int]) -> str:
+        """将UTXO ID转换为 "交易ID:输出索引" 字符串（用于JSON序列化）"""
+        return f"{utxo_id[0]}:{utxo_id[1]}"
+
+    @staticmethod
+    def utxo_id_from_str(utxo_id: str) -> Tuple[str, int]:
+        """从 "交易ID:输出索引" 字符串解析UTXO ID"""
+        transaction_id, output_index = utxo_id.rsplit(":", 1)
+        return (transaction_id, int(output_index))
 
     def add_utxo(self, utxo: UTXO) -> None:
         """添加UTXO"""
         utxo_id = utxo.get_utxo_id()
         self.utxos[utxo_id] = utxo
 
-    def remove_utxo(self, utxo_id: str) -> None:
+    def remove_utxo(self, utxo_id: Tuple[str, int]) -> None:
         """移除UTXO"""
         if utxo_id in self.utxos:
             del self.utxos[utxo_id]
 
-    def get_utxo(self, utxo_id: str) -> Optional[UTXO]:
+    def get_utxo(self, utxo_id: Tuple[str, int]) -> Optional[UTXO]:
         """获取UTXO"""
         return self.utxos.get(utxo_id)
 
@@ -560,18 +769,26 @@ class UTXOSet:
             List[UTXO]: 选中的UTXO列表
         """
         available_utxos = self.get_utxos_by_address(address)
-        available_utxos.sort(key=lambda x: x.amount, reverse=True)  # 优先选择大额UTXO
 
-        selected_utxos = []
-        total_selected = 0.0
+        # 余额不足时直接返回，无需排序
+        if sum(utxo.amount for utxo in available_utxos) < amount:
+            return []
 
+        available_utxos.sort(key=attrgetter('amount'), reverse=True)  # 优先选择大额UTXO
+
+        total_selected = 0.0
+        count = 0
         for utxo in available_utxos:
             if total_selected >= amount:
                 break
-            selected_utxos.append(utxo)
             total_selected += utxo.amount
+            count += 1
 
-        return selected_utxos if total_selected >= amount else []
+        # 浮点加法与求和顺序有关，预检查通过后按降序累加仍可能略少于目标金额
+        if total_selected < amount:
+            return []
+
+        return available_utxos[:count]
 
     def update_from_transaction(self, transaction: Transaction) -> None:
         """
@@ -579,28 +796,24 @@ class UTXOSet:
         Args:
             transaction: 交易对象
         """
+        utxos = self.utxos
+
         # 移除被消费的UTXO
         for input_tx in transaction.inputs:
-            utxo_id = input_tx.get_utxo_id()
-            if utxo_id in self.utxos:
-                self.utxos[utxo_id].is_spent = True
-                # 可以选择立即删除或标记为已花费
-                del self.utxos[utxo_id]
+            spent_utxo = utxos.pop((input_tx.transaction_id, input_tx.output_index), None)
+            if spent_utxo is not None:
+                spent_utxo.is_spent = True
 
-        # 添加新的UTXO
+        # 添加新的UTXO（HASH160在该UTXO首次被输入引用时才解码）
+        transaction_id = transaction.transaction_id
         for index, output in enumerate(transaction.outputs):
-            utxo = UTXO(
-                transaction_id=transaction.transaction_id,
-                output_index=index,
-                amount=output.amount,
-                recipient_address=output.recipient_address
-            )
-            self.add_utxo(utxo)
+            utxos[(transaction_id, index)] = UTXO(
+                transaction_id, index, output.amount, output.recipient_address)
 
-    def __contains__(self, utxo_id: str) -> bool:
+    def __contains__(self, utxo_id: Tuple[str, int]) -> bool:
         """检查UTXO是否存在"""
         return utxo_id in self.utxos
 
-    def __getitem__(self, utxo_id: str) -> UTXO:
+    def __getitem__(self, utxo_id: Tuple[str, int]) -> UTXO:
         """获取UTXO"""
         return self.utxos[utxo_id]
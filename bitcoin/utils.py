@@ -5,29 +5,43 @@
 包含比特币系统中使用的各种工具函数
 """
 
-import json
 import hashlib
 from typing import Dict, Any, Union
 
+import orjson
+
 
 class HashUtils:
     """统一的哈希计算工具类"""
 
     @staticmethod
-    def calculate_sha256(data: Union[str, Dict[str, Any]]) -> str:
+    def calculate_sha256(data: Union[str, bytes, Dict[str, Any]]) -> str:
         """
         计算SHA256哈希值
         Args:
-            data: 要计算哈希的数据（字符串或字典）
+            data: 要计算哈希的数据（字符串、字节或字典）
         Returns:
             str: 十六进制哈希值
         """
         if isinstance(data, dict):
-            data_string = json.dumps(data, sort_keys=True)
+            payload = HashUtils.canonical_bytes(data)
+        elif isinstance(data, str):
+            payload = data.encode()
         else:
-            data_string = data
+            payload = data
+
+        return hashlib.sha256(payload).hexdigest()
 
-        return hashlib.sha256(data_string.encode()).hexdigest()
+    @staticmethod
+    def canonical_bytes(data: Dict[str, Any]) -> bytes:
+        """
+        将字典编码为规范化字节串（键排序，用于哈希和签名）
+        Args:
+            data: 要编码的字典
+        Returns:
+            bytes: 规范化的JSON字节串
+        """
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
 
     @staticmethod
     def calculate_block_hash(index: int, merkle_root: str, previous_hash: str,
@@ -53,11 +67,11 @@ class HashUtils:
         return HashUtils.calculate_sha256(block_data)
 
     @staticmethod
-    def calculate_transaction_hash(transaction_data: str) -> str:
+    def calculate_transaction_hash(transaction_data: Union[str, bytes]) -> str:
         """
         计算交易哈希值
         Args:
-            transaction_data: 交易数据字符串
+            transaction_data: 交易数据（规范化字节串或字符串）
         Returns:
             str: 交易哈希值
         """
@@ -109,5 +123,9 @@ class CacheUtils:
         Returns:
             str: 缓存键
         """
-        key_data = str(args)
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # 非加密用途：blake2b 比 md5 更快，逐个参数更新避免构造整体字符串
+        hasher = hashlib.blake2b(digest_size=16)
+        for arg in args:
+            hasher.update(repr(arg).encode())
+            hasher.update(b"\x00")
+        return hasher.hexdigest()
@@ -7,7 +7,7 @@
 
 import secrets
 import hashlib
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import base58
 from ecdsa import SigningKey, VerifyingKey, SECP256k1
 from ecdsa.util import sigdecode_string, sigencode_string
@@ -56,38 +56,46 @@ class Wallet:
         hash160 = ripemd160.digest()
         # 3. 添加版本字节（0x00用于主网）
         versioned_payload = BITCOIN_ADDRESS_VERSION + hash160
-        # 4. 计算校验和（双SHA256的前4字节）
-        checksum = hashlib.sha256(hashlib.sha256(versioned_payload).digest()).digest()[:4]
-        # 5. 组合版本+哈希+校验和
-        binary_address = versioned_payload + checksum
-        # 6. Base58编码
-        address = base58.b58encode(binary_address).decode('utf-8')
+        # 4. Base58Check编码（一次完成双SHA256校验和计算与编码）
+        address = base58.b58encode_check(versioned_payload).decode('utf-8')
         return address
 
-    def sign_message(self, message: str) -> str:
+    def sign_message(self, message: Union[str, bytes]) -> str:
         """
         使用私钥对消息进行数字签名
         Args:
-            message: 要签名的消息
+            message: 要签名的消息（字符串或字节）
         Returns:
             str: 签名的16进制字符串
         """
-        message_bytes = message.encode('utf-8')
+        message_bytes = message.encode('utf-8') if isinstance(message, str) else message
         signature = self.signing_key.sign(message_bytes, sigencode=sigencode_string)
         return signature.hex()
 
-    def verify_signature(self, message: str, signature_hex: str, public_key_hex: str) -> bool:
+    def sign_messages(self, messages: List[bytes]) -> List[str]:
+        """
+        使用同一签名密钥批量签名多条消息（如交易的多个输入）
+        Args:
+            messages: 要签名的消息字节列表
+        Returns:
+            List[str]: 与输入顺序一致的签名16进制字符串列表
+        """
+        sign = self.signing_key.sign
+        return [sign(message, sigencode=sigencode_string).hex() for message in messages]
+
+    def verify_signature(self, message: Union[str, bytes], signature_hex: str,
+                         public_key_hex: str) -> bool:
         """
         验证数字签名
         Args:
-            message: 原始消息
+            message: 原始消息（字符串或字节）
             signature_hex: 签名的16进制字符串
             public_key_hex: 公钥的16进制字符串
         Returns:
             bool: 签名是否有效
         """
         try:
-            message_bytes = message.encode('utf-8')
+            message_bytes = message.encode('utf-8') if isinstance(message, str) else message
             signature_bytes = bytes.fromhex(signature_hex)
             public_key_bytes = bytes.fromhex(public_key_hex)
             # 从公钥创建验证密钥
@@ -109,10 +117,8 @@ class Wallet:
         """导出私钥（WIF格式）"""
         # 添加版本字节（0x80用于主网私钥）
         extended_key = PRIVATE_KEY_VERSION + self.private_key_bytes
-        # 计算校验和
-        checksum = hashlib.sha256(hashlib.sha256(extended_key).digest()).digest()[:4]
-        # 组合并Base58编码
-        wif = base58.b58encode(extended_key + checksum).decode('utf-8')
+        # Base58Check编码（自动附加校验和）
+        wif = base58.b58encode_check(extended_key).decode('utf-8')
         return wif
 
     @classmethod
@@ -150,7 +156,7 @@ class Wallet:
             # 分离校验和
             payload = decoded[:-4]
             checksum = decoded[-4:]
-            # 验证校验和
+            # 验证校验和（地址是公开数据，直接使用 == 比较即可，无需恒定时间比较）
             expected_checksum = hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
             return checksum == expected_checksum
         except Exception:
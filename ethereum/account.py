@@ -12,13 +12,19 @@
 """
 
 import hashlib
+import os
 import secrets
 import time
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
+from ecdsa import SigningKey, VerifyingKey, SECP256k1
+from ecdsa.util import sigdecode_string, sigencode_string
 
-@dataclass
+from .utils import DATACLASS_SLOTS, hash_json, keccak256
+
+
+@dataclass(**DATACLASS_SLOTS)
 class EthereumAccount:
     """以太坊账户"""
     address: str
@@ -47,6 +53,7 @@ class AccountManager:
     def __init__(self):
         self.accounts: Dict[str, EthereumAccount] = {}
         self.address_to_private_key: Dict[str, str] = {}
+        self._signing_keys: Dict[str, SigningKey] = {}  # 已解析的签名密钥缓存
 
     def create_account(self, initial_balance: int = 0) -> EthereumAccount:
         """
@@ -61,11 +68,8 @@ class AccountManager:
         # 生成私钥
         private_key = secrets.token_hex(32)
 
-        # 生成公钥（简化实现）
-        public_key = hashlib.sha256(private_key.encode()).hexdigest()
-
-        # 生成地址
-        address = "0x" + hashlib.sha256(public_key.encode()).hexdigest()[:40]
+        # 生成公钥和地址
+        public_key, address = self._derive_public_key_and_address(private_key)
 
         # 创建账户
         account = EthereumAccount(
@@ -92,11 +96,8 @@ class AccountManager:
         Returns:
             导入的账户
         """
-        # 生成公钥
-        public_key = hashlib.sha256(private_key.encode()).hexdigest()
-
-        # 生成地址
-        address = "0x" + hashlib.sha256(public_key.encode()).hexdigest()[:40]
+        # 生成公钥和地址
+        public_key, address = self._derive_public_key_and_address(private_key)
 
         # 创建账户
         account = EthereumAccount(
@@ -112,6 +113,44 @@ class AccountManager:
 
         return account
 
+    @staticmethod
+    def _derive_public_key_and_address(private_key: str) -> Tuple[str, str]:
+        """
+        从私钥派生公钥和地址
+
+        Args:
+            private_key: 私钥(16进制)
+
+        Returns:
+            (公钥, 地址)
+        """
+        # 生成SECP256k1公钥（64字节，x||y）
+        signing_key = SigningKey.from_string(bytes.fromhex(private_key), curve=SECP256k1)
+        public_key_bytes = signing_key.get_verifying_key().to_string()
+
+        return public_key_bytes.hex(), AccountManager._address_from_public_key(public_key_bytes)
+
+    @staticmethod
+    def _address_from_public_key(public_key_bytes: bytes) -> str:
+        """地址为公钥Keccak-256哈希的后20字节"""
+        return "0x" + keccak256(public_key_bytes)[-20:].hex()
+
+    @staticmethod
+    def _transaction_digest(transaction_data: Dict[str, Any]) -> bytes:
+        """交易数据的规范化Keccak-256摘要（待签名消息）"""
+        return keccak256(hash_json(transaction_data, default=str))
+
+    def _get_signing_key(self, address: str) -> SigningKey:
+        """获取地址对应的签名密钥（首次使用时解析并缓存）"""
+        signing_key = self._signing_keys.get(address)
+        if signing_key is None:
+            private_key = self.address_to_private_key.get(address)
+            if not private_key:
+                raise ValueError(f"未找到私钥: {address}")
+            signing_key = SigningKey.from_string(bytes.fromhex(private_key), curve=SECP256k1)
+            self._signing_keys[address] = signing_key
+        return signing_key
+
     def get_account(self, address: str) -> Optional[EthereumAccount]:
         """获取账户"""
         return self.accounts.get(address)
@@ -175,16 +214,14 @@ class AccountManager:
         Returns:
             交易签名
         """
-        private_key = self.address_to_private_key.get(from_address)
-        if not private_key:
-            raise ValueError(f"未找到私钥: {from_address}")
+        signing_key = self._get_signing_key(from_address)
 
-        # 简化的签名实现
-        transaction_str = str(transaction_data)
-        signature_data = f"{private_key}{transaction_str}".encode()
-        signature = hashlib.sha256(signature_data).hexdigest()
+        # 对交易摘要进行确定性ECDSA签名（RFC 6979）
+        digest = self._transaction_digest(transaction_data)
+        signature = signing_key.sign_digest_deterministic(
+            digest, hashfunc=hashlib.sha256, sigencode=sigencode_string)
 
-        return signature
+        return signature.hex()
 
     def verify_signature(self, address: str, transaction_data: Dict[str, Any],
                          signature: str) -> bool:
@@ -200,9 +237,25 @@ class AccountManager:
             签名是否有效
         """
         try:
-            expected_signature = self.sign_transaction(address, transaction_data)
-            return signature == expected_signature
-        except BaseException:
+            digest = self._transaction_digest(transaction_data)
+            signature_bytes = bytes.fromhex(signature)
+
+            # 已知公钥时直接验证
+            account = self.accounts.get(address)
+            if account and account.public_key:
+                verifying_key = VerifyingKey.from_string(
+                    bytes.fromhex(account.public_key), curve=SECP256k1)
+                return verifying_key.verify_digest(
+                    signature_bytes, digest, sigdecode=sigdecode_string)
+
+            # 否则从签名中恢复公钥，检查是否对应该地址
+            candidates = VerifyingKey.from_public_key_recovery_with_digest(
+                signature_bytes, digest, SECP256k1, sigdecode=sigdecode_string)
+            return any(
+                self._address_from_public_key(candidate.to_string()) == address
+                for candidate in candidates
+            )
+        except Exception:
             return False
 
     def list_accounts(self) -> List[EthereumAccount]:
@@ -232,10 +285,38 @@ class AccountManager:
             count: int,
             initial_balance: int = 0) -> List[EthereumAccount]:
         """批量创建账户"""
-        accounts = []
-        for _ in range(count):
-            account = self.create_account(initial_balance)
-            accounts.append(account)
+        # 一次系统调用取得全部私钥的随机字节，再按32字节切分
+        key_material = os.urandom(32 * count)
+
+        accounts = [None] * count
+        new_accounts: Dict[str, EthereumAccount] = {}
+        new_private_keys: Dict[str, str] = {}
+        new_signing_keys: Dict[str, SigningKey] = {}
+
+        for i in range(count):
+            private_key_bytes = key_material[32 * i:32 * (i + 1)]
+            signing_key = SigningKey.from_string(private_key_bytes, curve=SECP256k1)
+            public_key_bytes = signing_key.get_verifying_key().to_string()
+            address = self._address_from_public_key(public_key_bytes)
+            private_key = private_key_bytes.hex()
+
+            account = EthereumAccount(
+                address=address,
+                private_key=private_key,
+                public_key=public_key_bytes.hex(),
+                balance=initial_balance
+            )
+            accounts[i] = account
+            new_accounts[address] = account
+            new_private_keys[address] = private_key
+            # 顺便缓存已解析的签名密钥，后续签名无需重新解析
+            new_signing_keys[address] = signing_key
+
+        # 批量写入存储
+        self.accounts.update(new_accounts)
+        self.address_to_private_key.update(new_private_keys)
+        self._signing_keys.update(new_signing_keys)
+
         return accounts
 
     def export_accounts(self, include_private_keys: bool = False) -> Dict[str, Any]:
@@ -259,33 +340,60 @@ class AccountManager:
 
     def import_accounts(self, import_data: Dict[str, Any]):
         """导入账户数据"""
-        for address, account_data in import_data.get("accounts", {}).items():
-            account = EthereumAccount(
+        accounts_data = import_data.get("accounts", {})
+        now = int(time.time())
+
+        # 先构建本地字典，再一次性合并到存储中
+        new_accounts = {
+            address: EthereumAccount(
                 address=address,
                 balance=account_data.get("balance", 0),
                 nonce=account_data.get("nonce", 0),
-                creation_time=account_data.get("creation_time", int(time.time()))
+                creation_time=account_data.get("creation_time", now)
             )
+            for address, account_data in accounts_data.items()
+        }
 
-            self.accounts[address] = account
+        # 导入私钥（如果存在）
+        new_private_keys = {
+            address: account_data["private_key"]
+            for address, account_data in accounts_data.items()
+            if account_data.get("private_key")
+        }
 
-            # 导入私钥（如果存在）
-            private_key = account_data.get("private_key")
-            if private_key:
-                self.address_to_private_key[address] = private_key
+        self.accounts.update(new_accounts)
+        self.address_to_private_key.update(new_private_keys)
 
     def get_account_statistics(self) -> Dict[str, Any]:
         """获取账户统计信息"""
-        balances = [account.balance for account in self.accounts.values()]
+        total_accounts = len(self.accounts)
+        total_balance = 0
+        max_balance = None
+        min_balance = None
+        accounts_with_balance = 0
+        empty_accounts = 0
+
+        # 单次遍历完成所有统计（余额为任意精度wei，不适合定长数组）
+        for account in self.accounts.values():
+            balance = account.balance
+            total_balance += balance
+            if max_balance is None or balance > max_balance:
+                max_balance = balance
+            if min_balance is None or balance < min_balance:
+                min_balance = balance
+            if balance > 0:
+                accounts_with_balance += 1
+            elif balance == 0:
+                empty_accounts += 1
 
         return {
-            "total_accounts": len(self.accounts),
-            "total_balance": sum(balances),
-            "average_balance": sum(balances) / len(balances) if balances else 0,
-            "max_balance": max(balances) if balances else 0,
-            "min_balance": min(balances) if balances else 0,
-            "accounts_with_balance": len([b for b in balances if b > 0]),
-            "empty_accounts": len([b for b in balances if b == 0])
+            "total_accounts": total_accounts,
+            "total_balance": total_balance,
+            "average_balance": total_balance / total_accounts if total_accounts else 0,
+            "max_balance": max_balance if total_accounts else 0,
+            "min_balance": min_balance if total_accounts else 0,
+            "accounts_with_balance": accounts_with_balance,
+            "empty_accounts": empty_accounts
         }
 
     def cleanup_empty_accounts(self) -> int:
@@ -299,6 +407,7 @@ class AccountManager:
             del self.accounts[address]
             if address in self.address_to_private_key:
                 del self.address_to_private_key[address]
+            self._signing_keys.pop(address, None)
 
         return len(empty_addresses)
 
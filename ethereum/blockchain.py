@@ -11,14 +11,39 @@
 - 状态管理
 """
 
-import hashlib
+import heapq
+import itertools
 import time
-import json
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 
+from .utils import DATACLASS_SLOTS, canonical_json, hash_json, keccak256
 
-@dataclass
+
+# 替换交易池中相同发送方和nonce的交易时，gas价格至少需要提高的百分比
+_REPLACEMENT_GAS_PRICE_BUMP = 10
+
+
+def _encode_hash_field(value: Any) -> bytes:
+    """
+    编码单个哈希字段：1字节类型标记 + 4字节长度前缀 + 内容
+
+    整数按有符号大端最短字节编码（负数、任意位宽均可），字符串按UTF-8编码，
+    其他类型（如浮点时间戳）按 repr 编码，非法字段值交由验证环节拒绝而不是在构造时出错
+    """
+    if isinstance(value, int):
+        tag = b"i"
+        content = value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True)
+    elif isinstance(value, str):
+        tag = b"s"
+        content = value.encode()
+    else:
+        tag = b"r"
+        content = repr(value).encode()
+    return tag + len(content).to_bytes(4, "big") + content
+
+
+@dataclass(**DATACLASS_SLOTS)
 class EthereumTransaction:
     """以太坊交易"""
     from_address: str
@@ -31,27 +56,35 @@ class EthereumTransaction:
     signature: str = ""
     transaction_hash: str = field(default="", init=False)
     timestamp: int = field(default_factory=lambda: int(time.time()))
+    # 32字节原始哈希，供Merkle树等内部哈希计算直接使用，避免16进制往返转换
+    hash_bytes: bytes = field(default=b"", init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """计算交易哈希"""
         if not self.transaction_hash:
-            self.transaction_hash = self.calculate_hash()
+            self.hash_bytes = self.calculate_hash_bytes()
+            self.transaction_hash = self.hash_bytes.hex()
 
     def calculate_hash(self) -> str:
         """计算交易哈希"""
-        transaction_data = {
-            "from": self.from_address,
-            "to": self.to_address,
-            "value": self.value,
-            "gas_limit": self.gas_limit,
-            "gas_price": self.gas_price,
-            "data": self.data,
-            "nonce": self.nonce,
-            "timestamp": self.timestamp
-        }
-
-        transaction_str = json.dumps(transaction_data, sort_keys=True)
-        return hashlib.sha256(transaction_str.encode()).hexdigest()
+        return self.calculate_hash_bytes().hex()
+
+    def calculate_hash_bytes(self) -> bytes:
+        """计算交易哈希（32字节原始值）"""
+        return keccak256(self._encode_for_hash())
+
+    def _encode_for_hash(self) -> bytes:
+        """按固定字段顺序编码交易，省去构造字典、键排序和JSON转义"""
+        return b"".join(map(_encode_hash_field, (
+            self.from_address,
+            self.to_address,
+            self.value,
+            self.gas_limit,
+            self.gas_price,
+            self.data,
+            self.nonce,
+            self.timestamp,
+        )))
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -87,7 +120,7 @@ class EthereumTransaction:
         return f"Transaction({self.transaction_hash[:10]}...)"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class EthereumBlock:
     """以太坊区块"""
     block_number: int
@@ -102,15 +135,33 @@ class EthereumBlock:
     miner: str = ""
     difficulty: int = 1000000
     nonce: int = 0
-    block_hash: str = field(default="", init=False)
+    # Merkle树各层节点（第0层为交易哈希），用于增量更新交易根
+    _merkle_layers: List[List[bytes]] = field(
+        default_factory=lambda: [[]], init=False, repr=False, compare=False)
+    # 区块哈希缓存，_dirty 为 True 时在下次读取 block_hash 时重新计算
+    _block_hash_cache: str = field(default="", init=False, repr=False, compare=False)
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        """计算区块哈希"""
-        if not self.block_hash:
-            self.block_hash = self.calculate_hash()
+        """构建Merkle树（区块哈希延迟到首次读取时计算）"""
+        self._merkle_layers = self._build_merkle_layers(
+            [tx.hash_bytes for tx in self.transactions])
 
         if not self.transactions_root:
-            self.transactions_root = self.calculate_transactions_root()
+            self.transactions_root = self._merkle_root_hex()
+
+    @property
+    def block_hash(self) -> str:
+        """区块哈希（区块内容变化后首次读取时重新计算）"""
+        if self._dirty:
+            self._block_hash_cache = self.calculate_hash()
+            self._dirty = False
+        return self._block_hash_cache
+
+    @block_hash.setter
+    def block_hash(self, value: str):
+        self._block_hash_cache = value
+        self._dirty = False
 
     def calculate_hash(self) -> str:
         """计算区块哈希"""
@@ -127,26 +178,74 @@ class EthereumBlock:
             "nonce": self.nonce
         }
 
-        block_str = json.dumps(block_data, sort_keys=True)
-        return hashlib.sha256(block_str.encode()).hexdigest()
+        return keccak256(hash_json(block_data)).hex()
+
+    @staticmethod
+    def _build_merkle_layers(leaves: List[bytes]) -> List[List[bytes]]:
+        """
+        自底向上构建Merkle树（奇数个节点时最后一个节点直接提升到上一层）
+
+        Args:
+            leaves: 交易哈希列表
+
+        Returns:
+            各层节点列表，最后一层为根
+        """
+        layers = [leaves]
+        while len(layers[-1]) > 1:
+            nodes = layers[-1]
+            # 每层一次性配对拼接并哈希（zip会忽略奇数个节点时的最后一个）
+            parents = list(map(keccak256, map(bytes.__add__, nodes[0::2], nodes[1::2])))
+            if len(nodes) % 2:
+                parents.append(nodes[-1])
+            layers.append(parents)
+        return layers
+
+    def _merkle_root_hex(self) -> str:
+        """当前Merkle根（16进制）"""
+        top = self._merkle_layers[-1]
+        return top[0].hex() if top else "0" * 64
+
+    def _append_merkle_leaf(self, leaf: bytes):
+        """追加叶子节点，只更新从该叶子到根路径上的节点（O(log N)）"""
+        layers = self._merkle_layers
+        layers[0].append(leaf)
+
+        level = 0
+        while len(layers[level]) > 1:
+            nodes = layers[level]
+            index = len(nodes) - 1
+            if index % 2:
+                node = keccak256(nodes[index - 1] + nodes[index])
+            else:
+                node = nodes[index]
+
+            if level + 1 == len(layers):
+                layers.append([])
+            parents = layers[level + 1]
+            if index // 2 < len(parents):
+                parents[index // 2] = node
+            else:
+                parents.append(node)
+            level += 1
 
     def calculate_transactions_root(self) -> str:
-        """计算交易根哈希"""
+        """计算交易根哈希（完整重建Merkle树）"""
         if not self.transactions:
             return "0" * 64
 
-        transaction_hashes = [tx.transaction_hash for tx in self.transactions]
-        combined = "".join(transaction_hashes)
-        return hashlib.sha256(combined.encode()).hexdigest()
+        leaves = [tx.hash_bytes for tx in self.transactions]
+        return self._build_merkle_layers(leaves)[-1][0].hex()
 
     def add_transaction(self, transaction: EthereumTransaction):
         """添加交易"""
         self.transactions.append(transaction)
         self.gas_used += transaction.gas_limit
 
-        # 重新计算根哈希
-        self.transactions_root = self.calculate_transactions_root()
-        self.block_hash = self.calculate_hash()
+        # 增量更新Merkle根，区块哈希延迟到下次读取时计算
+        self._append_merkle_leaf(transaction.hash_bytes)
+        self.transactions_root = self._merkle_root_hex()
+        self._dirty = True
 
     def get_transaction_count(self) -> int:
         """获取交易数量"""
@@ -178,7 +277,7 @@ class EthereumBlock:
             for tx_data in data.get("transactions", [])
         ]
 
-        return cls(
+        block = cls(
             block_number=data["number"],
             parent_hash=data["parent_hash"],
             transactions=transactions,
@@ -193,6 +292,12 @@ class EthereumBlock:
             nonce=data.get("nonce", 0)
         )
 
+        # 恢复导出时的区块哈希，保证父哈希链接和哈希索引一致
+        if data.get("hash"):
+            block.block_hash = data["hash"]
+
+        return block
+
     def __str__(self) -> str:
         return f"Block(#{self.block_number}, {len(self.transactions)} txs)"
 
@@ -202,14 +307,34 @@ class EthereumBlockchain:
 
     def __init__(self):
         self.blocks: List[EthereumBlock] = []
-        self.pending_transactions: List[EthereumTransaction] = []
-        self.transaction_pool: Dict[str, EthereumTransaction] = {}
+        self._reset_transaction_pool()
         self.state: Dict[str, Any] = {}  # 世界状态
+        self.balances: Dict[str, int] = {}  # 账户余额，直接以地址为键
         self.chain_id = 1
 
+        # 哈希索引，避免线性扫描
+        self._block_by_hash: Dict[str, EthereumBlock] = {}
+        self._tx_by_hash: Dict[str, EthereumTransaction] = {}
+        # 地址 -> 涉及该地址的已上链交易（按上链顺序）
+        self._tx_history_by_address: Dict[str, List[EthereumTransaction]] = {}
+
+        # 链上区块难度的累计值，随区块追加更新
+        self._total_difficulty = 0
+
         # 创建创世区块
         self._create_genesis_block()
 
+    def _reset_transaction_pool(self):
+        """清空交易池及其索引"""
+        # 待处理交易：交易哈希 -> 交易（按加入顺序）
+        self._pending: Dict[str, EthereumTransaction] = {}
+        # 按gas价格排序的最大堆 (-gas_price, 序号, 交易哈希)，被替换的条目在出堆时跳过
+        self._pending_heap: List[Tuple[int, int, str]] = []
+        self._pending_counter = itertools.count()
+        self.transaction_pool: Dict[str, EthereumTransaction] = {}
+        # 交易池索引：(发送方, nonce) -> 交易哈希
+        self._txs_by_sender_nonce: Dict[Tuple[str, int], str] = {}
+
     def _create_genesis_block(self):
         """创建创世区块"""
         genesis_block = EthereumBlock(
@@ -220,7 +345,29 @@ class EthereumBlockchain:
             timestamp=int(time.time())
         )
 
-        self.blocks.append(genesis_block)
+        self._append_block(genesis_block)
+
+    def _append_block(self, block: EthereumBlock):
+        """将区块加入链中并更新哈希索引"""
+        self.blocks.append(block)
+        self._total_difficulty += block.difficulty
+        self._index_block(block)
+
+    def _index_block(self, block: EthereumBlock):
+        """登记区块及其交易到哈希索引和地址交易历史索引"""
+        self._block_by_hash[block.block_hash] = block
+        for tx in block.transactions:
+            self._tx_by_hash[tx.transaction_hash] = tx
+        self._record_tx_history(block)
+
+    def _record_tx_history(self, block: EthereumBlock):
+        """将区块中的交易追加到地址交易历史索引"""
+        history = self._tx_history_by_address
+        for tx in block.transactions:
+            history.setdefault(tx.from_address, []).append(tx)
+            # 自转账只记录一次
+            if tx.to_address != tx.from_address:
+                history.setdefault(tx.to_address, []).append(tx)
 
     def get_latest_block(self) -> EthereumBlock:
         """获取最新区块"""
@@ -234,15 +381,116 @@ class EthereumBlockchain:
 
     def get_block_by_hash(self, block_hash: str) -> Optional[EthereumBlock]:
         """根据区块哈希获取区块"""
-        for block in self.blocks:
-            if block.block_hash == block_hash:
-                return block
-        return None
-
-    def add_transaction(self, transaction: EthereumTransaction):
-        """添加交易到交易池"""
-        self.pending_transactions.append(transaction)
+        return self._block_by_hash.get(block_hash)
+
+    def add_transaction(self, transaction: EthereumTransaction) -> bool:
+        """
+        添加交易到交易池
+
+        相同发送方和nonce已有待处理交易时，新交易的gas价格需至少提高
+        _REPLACEMENT_GAS_PRICE_BUMP 百分比才会替换旧交易，否则拒绝
+
+        Returns:
+            是否加入交易池
+        """
+        key = (transaction.from_address, transaction.nonce)
+        stale_hash = self._txs_by_sender_nonce.get(key)
+        stale = self._pending.get(stale_hash) if stale_hash is not None else None
+
+        if stale is not None:
+            if transaction.gas_price * 100 < stale.gas_price * (100 + _REPLACEMENT_GAS_PRICE_BUMP):
+                return False
+            # 移除被替换的旧交易，其堆条目在出堆时跳过
+            del self._pending[stale_hash]
+            self.transaction_pool.pop(stale_hash, None)
+
+        self._push_pending(transaction)
+        self._txs_by_sender_nonce[key] = transaction.transaction_hash
         self.transaction_pool[transaction.transaction_hash] = transaction
+        return True
+
+    def _push_pending(self, transaction: EthereumTransaction):
+        """加入待处理交易并压入gas价格堆"""
+        tx_hash = transaction.transaction_hash
+        self._pending[tx_hash] = transaction
+        heapq.heappush(
+            self._pending_heap,
+            (-transaction.gas_price, next(self._pending_counter), tx_hash))
+
+        # 被替换的条目过多时重建堆，避免堆无限增长
+        if len(self._pending_heap) > 2 * len(self._pending) + 64:
+            self._rebuild_pending_heap()
+
+    def _rebuild_pending_heap(self):
+        """只保留仍在待处理交易中的条目重建堆"""
+        self._pending_heap = [
+            entry for entry in self._pending_heap if entry[2] in self._pending
+        ]
+        heapq.heapify(self._pending_heap)
+
+    @property
+    def pending_transactions(self) -> Tuple[EthereumTransaction, ...]:
+        """
+        待处理交易快照（按加入顺序，O(N) 复制）
+
+        返回不可变元组，对其 append/remove 会直接报错而不是静默失效；
+        增删请使用 add_transaction / remove_pending_transaction
+        """
+        return tuple(self._pending.values())
+
+    def remove_pending_transaction(self, tx_hash: str) -> bool:
+        """
+        从交易池移除待处理交易
+
+        Args:
+            tx_hash: 交易哈希
+
+        Returns:
+            是否找到并移除
+        """
+        transaction = self._pending.pop(tx_hash, None)
+        if transaction is None:
+            return False
+
+        # 堆中的条目在出堆时跳过
+        self.transaction_pool.pop(tx_hash, None)
+        key = (transaction.from_address, transaction.nonce)
+        if self._txs_by_sender_nonce.get(key) == tx_hash:
+            del self._txs_by_sender_nonce[key]
+        return True
+
+    def get_pending_transaction_by_nonce(self, from_address: str,
+                                         nonce: int) -> Optional[EthereumTransaction]:
+        """根据发送方和nonce获取待处理交易"""
+        tx_hash = self._txs_by_sender_nonce.get((from_address, nonce))
+        if tx_hash is None:
+            return None
+        return self._pending.get(tx_hash)
+
+    def _pop_pending_by_gas_price(self, count: int) -> List[EthereumTransaction]:
+        """
+        按gas价格从高到低取出待处理交易（价格相同时先加入的优先）
+
+        Args:
+            count: 最多取出的交易数量
+
+        Returns:
+            取出的交易列表
+        """
+        selected = []
+        heap = self._pending_heap
+        while heap and len(selected) < count:
+            tx_hash = heapq.heappop(heap)[2]
+            transaction = self._pending.pop(tx_hash, None)
+            if transaction is None:
+                continue  # 已被替换的过期条目
+
+            selected.append(transaction)
+            key = (transaction.from_address, transaction.nonce)
+            if self._txs_by_sender_nonce.get(key) == tx_hash:
+                del self._txs_by_sender_nonce[key]
+
+        return selected
 
     def get_transaction(self, tx_hash: str) -> Optional[EthereumTransaction]:
         """获取交易"""
@@ -250,61 +498,51 @@ class EthereumBlockchain:
         if tx_hash in self.transaction_pool:
             return self.transaction_pool[tx_hash]
 
-        # 在区块中查找
-        for block in self.blocks:
-            for tx in block.transactions:
-                if tx.transaction_hash == tx_hash:
-                    return tx
-
-        return None
+        # 在已打包的交易中查找
+        return self._tx_by_hash.get(tx_hash)
 
     def mine_block(self, miner_address: str, max_transactions: int = 100) -> EthereumBlock:
         """挖矿创建新区块"""
         latest_block = self.get_latest_block()
 
-        # 选择待处理的交易
-        selected_transactions = self.pending_transactions[:max_transactions]
+        # 按gas价格选择待处理的交易（同时从待处理交易和nonce索引中移除）
+        # 已打包的交易保留在交易池中以便查询
+        selected_transactions = self._pop_pending_by_gas_price(max_transactions)
+
+        # 计算Gas使用量
+        total_gas_used = sum(tx.gas_limit for tx in selected_transactions)
 
         # 创建新区块
         new_block = EthereumBlock(
             block_number=latest_block.block_number + 1,
             parent_hash=latest_block.block_hash,
             transactions=selected_transactions.copy(),
-            miner=miner_address
+            miner=miner_address,
+            gas_used=total_gas_used
         )
 
-        # 计算Gas使用量
-        total_gas_used = sum(tx.gas_limit for tx in selected_transactions)
-        new_block.gas_used = total_gas_used
-
         # 添加区块到链中
-        self.blocks.append(new_block)
-
-        # 从待处理交易中移除已打包的交易
-        for tx in selected_transactions:
-            if tx in self.pending_transactions:
-                self.pending_transactions.remove(tx)
-            # 保留在交易池中以便查询
+        self._append_block(new_block)
 
         return new_block
 
     def get_balance(self, address: str) -> int:
         """获取地址余额"""
-        return self.state.get(f"balance_{address}", 0)
+        return self.balances.get(address, 0)
 
     def set_balance(self, address: str, balance: int):
         """设置地址余额"""
-        self.state[f"balance_{address}"] = balance
+        self.balances[address] = balance
 
     def transfer_balance(self, from_address: str, to_address: str, amount: int) -> bool:
         """转移余额"""
-        from_balance = self.get_balance(from_address)
+        balances = self.balances
+        from_balance = balances.get(from_address, 0)
         if from_balance < amount:
             return False
 
-        self.set_balance(from_address, from_balance - amount)
-        to_balance = self.get_balance(to_address)
-        self.set_balance(to_address, to_balance + amount)
+        balances[from_address] = from_balance - amount
+        balances[to_address] = balances.get(to_address, 0) + amount
 
         return True
 
@@ -314,7 +552,7 @@ class EthereumBlockchain:
 
     def get_total_difficulty(self) -> int:
         """获取总难度"""
-        return sum(block.difficulty for block in self.blocks)
+        return self._total_difficulty
 
     def validate_block(self, block: EthereumBlock) -> bool:
         """验证区块"""
@@ -332,31 +570,48 @@ class EthereumBlockchain:
         if block.transactions_root != expected_tx_root:
             return False
 
-        # 检查区块哈希
-        expected_hash = block.calculate_hash()
-        if block.block_hash != expected_hash:
+        # 检查区块哈希（block_hash 为缓存值，未修改的区块不会在此重复计算）
+        if block.block_hash != block.calculate_hash():
             return False
 
         return True
 
     def validate_transaction(self, transaction: EthereumTransaction) -> bool:
         """验证交易"""
-        # 检查交易哈希
-        expected_hash = transaction.calculate_hash()
-        if transaction.transaction_hash != expected_hash:
+        # 数额不能为负（编码允许构造这类交易，由此处拒绝）
+        if transaction.value < 0 or transaction.gas_limit < 0 or transaction.gas_price < 0:
             return False
 
-        # 检查余额（简化验证）
+        # 先做廉价的余额检查（简化验证），不通过时无需重新计算哈希
         sender_balance = self.get_balance(transaction.from_address)
         total_cost = transaction.value + (transaction.gas_limit * transaction.gas_price)
         if sender_balance < total_cost:
             return False
 
+        # 检查交易哈希：32字节摘要与构造时的缓存一致，且各索引使用的16进制哈希与摘要对应
+        hash_bytes = transaction.calculate_hash_bytes()
+        if hash_bytes != transaction.hash_bytes:
+            return False
+        if transaction.transaction_hash != hash_bytes.hex():
+            return False
+
         return True
 
+    def bulk_validate(self) -> List[bool]:
+        """
+        批量验证交易池中的全部待处理交易
+
+        只是逐笔调用 validate_transaction 的便捷封装，并不比调用方自己循环更快
+
+        Returns:
+            与 pending_transactions 顺序对应的验证结果列表
+        """
+        validate = self.validate_transaction
+        return [validate(tx) for tx in self._pending.values()]
+
     def get_pending_transactions_count(self) -> int:
         """获取待处理交易数量"""
-        return len(self.pending_transactions)
+        return len(self._pending)
 
     def get_blockchain_info(self) -> Dict[str, Any]:
         """获取区块链信息"""
@@ -367,7 +622,7 @@ class EthereumBlockchain:
             "latest_block_number": latest_block.block_number if latest_block else 0,
             "latest_block_hash": latest_block.block_hash if latest_block else "",
             "total_blocks": len(self.blocks),
-            "pending_transactions": len(self.pending_transactions),
+            "pending_transactions": len(self._pending),
             "total_difficulty": self.get_total_difficulty(),
             "average_block_time": self._calculate_average_block_time()
         }
@@ -377,11 +632,8 @@ class EthereumBlockchain:
         if len(self.blocks) < 2:
             return 0.0
 
-        total_time = 0
-        for i in range(1, len(self.blocks)):
-            time_diff = self.blocks[i].timestamp - self.blocks[i - 1].timestamp
-            total_time += time_diff
-
+        # 相邻区块时间差之和可直接化简为首尾区块的时间差
+        total_time = self.blocks[-1].timestamp - self.blocks[0].timestamp
         return total_time / (len(self.blocks) - 1)
 
     def export_blockchain(self) -> Dict[str, Any]:
@@ -389,40 +641,49 @@ class EthereumBlockchain:
         return {
             "chain_id": self.chain_id,
             "blocks": [block.to_dict() for block in self.blocks],
-            "pending_transactions": [tx.to_dict() for tx in self.pending_transactions],
+            "pending_transactions": [tx.to_dict() for tx in self._pending.values()],
             "state": self.state.copy(),
+            "balances": self.balances.copy(),
             "export_timestamp": int(time.time())
         }
 
+    def export_blockchain_bytes(self) -> bytes:
+        """导出区块链数据并直接序列化为JSON字节串"""
+        return canonical_json(self.export_blockchain())
+
     def import_blockchain(self, blockchain_data: Dict[str, Any]):
         """导入区块链数据"""
         self.chain_id = blockchain_data.get("chain_id", 1)
         self.state = blockchain_data.get("state", {})
+        self.balances = dict(blockchain_data.get("balances", {}))
 
-        # 导入区块
-        self.blocks = []
-        for block_data in blockchain_data.get("blocks", []):
-            block = EthereumBlock.from_dict(block_data)
-            self.blocks.append(block)
+        # 兼容旧格式：余额以 "balance_<地址>" 键存储在state中
+        legacy_keys = [key for key in self.state if key.startswith("balance_")]
+        for key in legacy_keys:
+            self.balances.setdefault(key[len("balance_"):], self.state.pop(key))
 
-        # 导入待处理交易
-        self.pending_transactions = []
-        self.transaction_pool = {}
+        # 导入区块（各索引一次性构建，而不是逐个区块增长）
+        self.blocks = [
+            EthereumBlock.from_dict(block_data)
+            for block_data in blockchain_data.get("blocks", [])
+        ]
+        self._block_by_hash = {block.block_hash: block for block in self.blocks}
+        self._tx_by_hash = {
+            tx.transaction_hash: tx for block in self.blocks for tx in block.transactions
+        }
+        self._total_difficulty = sum(block.difficulty for block in self.blocks)
+        self._tx_history_by_address = {}
+        for block in self.blocks:
+            self._record_tx_history(block)
+
+        # 导入待处理交易，与新交易走同一入池规则
+        self._reset_transaction_pool()
         for tx_data in blockchain_data.get("pending_transactions", []):
-            tx = EthereumTransaction.from_dict(tx_data)
-            self.pending_transactions.append(tx)
-            self.transaction_pool[tx.transaction_hash] = tx
+            self.add_transaction(EthereumTransaction.from_dict(tx_data))
 
     def get_transaction_history(self, address: str) -> List[EthereumTransaction]:
         """获取地址的交易历史"""
-        transactions = []
-
-        for block in self.blocks:
-            for tx in block.transactions:
-                if tx.from_address == address or tx.to_address == address:
-                    transactions.append(tx)
-
-        return transactions
+        return list(self._tx_history_by_address.get(address, ()))
 
     def __str__(self) -> str:
-        return f"EthereumBlockchain(blocks={len(self.blocks)}, pending_txs={len(self.pending_transactions)})"
+        return f"EthereumBlockchain(blocks={len(self.blocks)}, pending_txs={len(self._pending)})"
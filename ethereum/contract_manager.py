@@ -12,14 +12,18 @@
 """
 
 import json
+import sys
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from operator import attrgetter
+from typing import (Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple,
+                    ValuesView)
 from dataclasses import dataclass, field
 from .smart_contract import SmartContract, ContractState
 from .virtual_machine import EthereumVM, VMError
+from .utils import DATACLASS_SLOTS, canonical_json
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ContractInfo:
     """合约信息"""
     name: str
@@ -31,70 +35,184 @@ class ContractInfo:
     tags: List[str] = field(default_factory=list)
 
 
+@dataclass(**DATACLASS_SLOTS)
+class CallSpec:
+    """批量调用中的单个调用"""
+    address: Optional[str]
+    function: Optional[str]
+    args: Optional[List[Any]] = None
+    caller: str = "0x0"
+    value: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CallSpec':
+        """从调用描述字典创建（缺少地址或函数名时在执行时报错，而不是在此处）"""
+        return cls(
+            address=data.get("address"),
+            function=data.get("function"),
+            args=data.get("args", []),
+            caller=data.get("caller", "0x0"),
+            value=data.get("value", 0)
+        )
+
+
+# 导出时写入的合约信息字段
+_EXPORT_INFO_FIELDS = ("name", "version", "deployer", "deployment_time", "description", "tags")
+_export_info_getter = attrgetter(*_EXPORT_INFO_FIELDS)
+
+
+if hasattr(time, "CLOCK_REALTIME_COARSE"):
+    def _coarse_now() -> int:
+        """当前秒级时间戳（Linux下由vDSO提供的粗粒度时钟，秒级精度足够）"""
+        return int(time.clock_gettime(time.CLOCK_REALTIME_COARSE))
+else:
+    def _coarse_now() -> int:
+        """当前秒级时间戳"""
+        return int(time.time())
+
+
 class ContractRegistry:
     """合约注册表"""
 
     def __init__(self):
         self.contracts: Dict[str, ContractInfo] = {}  # address -> info
-        self.name_index: Dict[str, List[str]] = {}    # name -> addresses
-        self.tag_index: Dict[str, List[str]] = {}     # tag -> addresses
+        # name/tag -> {address: info}，查找时直接得到合约信息，无需再查 contracts
+        self.name_index: Dict[str, Dict[str, ContractInfo]] = {}
+        self.tag_index: Dict[str, Dict[str, ContractInfo]] = {}
+        # 每个名称/标签下的合约数量，随注册/注销更新，统计时复制返回
+        self._name_counts: Dict[str, int] = {}
+        self._tag_counts: Dict[str, int] = {}
 
     def register(self, contract_info: ContractInfo):
         """注册合约"""
-        address = contract_info.address
-        self.contracts[address] = contract_info
-
-        # 更新名称索引
-        name = contract_info.name
-        if name not in self.name_index:
-            self.name_index[name] = []
-        self.name_index[name].append(address)
-
-        # 更新标签索引
-        for tag in contract_info.tags:
-            if tag not in self.tag_index:
-                self.tag_index[tag] = []
-            self.tag_index[tag].append(address)
+        self.bulk_register((contract_info,))
+
+    def bulk_register(self, contract_infos: Iterable[ContractInfo]) -> int:
+        """
+        批量注册合约（与逐个调用 register 结果相同，循环内使用局部变量减少属性查找）
+
+        地址已注册时先从名称/标签索引中移除旧的合约信息，再登记新的
+
+        Args:
+            contract_infos: 合约信息序列
+
+        Returns:
+            注册的合约数量
+        """
+        contracts = self.contracts
+        name_index = self.name_index
+        tag_index = self.tag_index
+        name_counts = self._name_counts
+        tag_counts = self._tag_counts
+        intern = sys.intern
+        count = 0
+
+        for contract_info in contract_infos:
+            address = contract_info.address
+            previous = contracts.get(address)
+            if previous is not None:
+                self._unindex(previous)
+            contracts[address] = contract_info
+
+            # 驻留名称和标签字符串，大量合约共用同一名称/标签时索引键可按指针比较
+            contract_info.name = name = intern(contract_info.name)
+            contract_info.tags = tags = [intern(tag) for tag in contract_info.tags]
+
+            # 更新名称索引
+            bucket = name_index.setdefault(name, {})
+            if address not in bucket:
+                name_counts[name] = name_counts.get(name, 0) + 1
+            bucket[address] = contract_info
+
+            # 更新标签索引
+            for tag in tags:
+                bucket = tag_index.setdefault(tag, {})
+                if address not in bucket:
+                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+                bucket[address] = contract_info
+            count += 1
+
+        return count
 
     def unregister(self, address: str):
         """注销合约"""
-        if address not in self.contracts:
+        contract_info = self.contracts.pop(address, None)
+        if contract_info is None:
             return False
 
-        contract_info = self.contracts[address]
-
-        # 从名称索引中移除
-        name = contract_info.name
-        if name in self.name_index:
-            self.name_index[name].remove(address)
-            if not self.name_index[name]:
-                del self.name_index[name]
+        self._unindex(contract_info)
+        return True
 
-        # 从标签索引中移除
+    def _unindex(self, contract_info: ContractInfo):
+        """从名称/标签索引中移除合约信息"""
+        address = contract_info.address
+        self._remove_from_index(self.name_index, self._name_counts, contract_info.name, address)
         for tag in contract_info.tags:
-            if tag in self.tag_index:
-                self.tag_index[tag].remove(address)
-                if not self.tag_index[tag]:
-                    del self.tag_index[tag]
-
-        # 移除合约信息
-        del self.contracts[address]
-        return True
+            self._remove_from_index(self.tag_index, self._tag_counts, tag, address)
+
+    @staticmethod
+    def _remove_from_index(index: Dict[str, Dict[str, ContractInfo]],
+                           counts: Dict[str, int], key: str, address: str):
+        """从名称/标签索引中移除地址并同步计数，桶为空时删除该键"""
+        bucket = index.get(key)
+        if bucket is None or bucket.pop(address, None) is None:
+            return
+
+        if bucket:
+            counts[key] -= 1
+        else:
+            del index[key]
+            del counts[key]
 
     def find_by_name(self, name: str, version: str = None) -> List[ContractInfo]:
         """按名称查找合约"""
-        addresses = self.name_index.get(name, [])
-        contracts = [self.contracts[addr] for addr in addresses]
+        contracts = self.name_index.get(name, {}).values()
 
         if version:
-            contracts = [c for c in contracts if c.version == version]
+            return [c for c in contracts if c.version == version]
 
-        return contracts
+        return list(contracts)
 
     def find_by_tag(self, tag: str) -> List[ContractInfo]:
         """按标签查找合约"""
-        addresses = self.tag_index.get(tag, [])
-        return [self.contracts[addr] for addr in addresses]
+        return list(self.tag_index.get(tag, {}).values())
+
+    def find_by_filters(self, name: str = None, tags: List[str] = None,
+                        version: str = None) -> List[ContractInfo]:
+        """
+        按名称和多个标签组合查找合约（同时满足全部条件）
+
+        从最小的候选索引出发，逐个检查是否出现在其余索引中，
+        复杂度为 O(最小候选集大小 × 条件数)
+
+        Args:
+            name: 合约名称
+            tags: 标签列表（需全部包含）
+            version: 版本号
+
+        Returns:
+            匹配的合约信息列表
+        """
+        candidates = []
+        if name:
+            candidates.append(self.name_index.get(name, {}))
+        for tag in tags or ():
+            candidates.append(self.tag_index.get(tag, {}))
+
+        if not candidates:
+            contracts = self.iter_all()
+        else:
+            candidates.sort(key=len)
+            smallest, others = candidates[0], candidates[1:]
+            contracts = [
+                info for address, info in smallest.items()
+                if all(address in index for index in others)
+            ]
+
+        if version:
+            return [c for c in contracts if c.version == version]
+
+        return list(contracts)
 
     def get_info(self, address: str) -> Optional[ContractInfo]:
         """获取合约信息"""
@@ -104,20 +222,23 @@ class ContractRegistry:
         """列出所有合约"""
         return list(self.contracts.values())
 
+    def iter_all(self) -> ValuesView[ContractInfo]:
+        """
+        遍历所有合约（返回注册表的实时视图，不复制列表；遍历期间不能注册/注销合约）
+
+        Returns:
+            合约信息视图
+        """
+        return self.contracts.values()
+
     def get_statistics(self) -> Dict[str, Any]:
-        """获取统计信息"""
+        """获取统计信息（按名称/标签的计数直接复制自增量维护的计数器）"""
         return {
             "total_contracts": len(self.contracts),
-            "unique_names": len(self.name_index),
-            "total_tags": len(self.tag_index),
-            "contracts_by_name": {
-                name: len(addresses)
-                for name, addresses in self.name_index.items()
-            },
-            "contracts_by_tag": {
-                tag: len(addresses)
-                for tag, addresses in self.tag_index.items()
-            }
+            "unique_names": len(self._name_counts),
+            "total_tags": len(self._tag_counts),
+            "contracts_by_name": dict(self._name_counts),
+            "contracts_by_tag": dict(self._tag_counts)
         }
 
 
@@ -129,6 +250,10 @@ class ContractManager:
         self.registry = ContractRegistry()
         self.templates: Dict[str, Dict[str, Any]] = {}
 
+        # 预先绑定虚拟机方法，转发调用时省去属性查找
+        self._vm_call = self.vm.call_contract
+        self._vm_get = self.vm.get_contract
+
     def register_template(self, name: str, template: Dict[str, Any]):
         """注册合约模板"""
         self.templates[name] = template
@@ -158,8 +283,9 @@ class ContractManager:
     def deploy_contract(self, contract: SmartContract, deployer: str,
                         constructor_args: List[Any] = None,
                         contract_name: str = "", version: str = "1.0.0",
-                        description: str = "", tags: List[str] = None) -> str:
-        """部署合约并注册"""
+                        description: str = "", tags: List[str] = None,
+                        _now: Optional[int] = None) -> str:
+        """部署合约并注册（_now 为批量部署时共用的部署时间戳）"""
         # 部署合约
         address = self.vm.deploy_contract(contract, constructor_args, deployer)
 
@@ -169,7 +295,7 @@ class ContractManager:
             version=version,
             address=address,
             deployer=deployer,
-            deployment_time=int(time.time()),
+            deployment_time=_now if _now is not None else _coarse_now(),
             description=description,
             tags=tags or []
         )
@@ -181,33 +307,88 @@ class ContractManager:
     def deploy_from_template(self, template_name: str, deployer: str,
                              constructor_args: List[Any] = None,
                              contract_name: str = "", version: str = "1.0.0",
-                             description: str = "", tags: List[str] = None) -> str:
+                             description: str = "", tags: List[str] = None,
+                             _now: Optional[int] = None) -> str:
         """从模板部署合约"""
         contract = self.create_contract_from_template(template_name, constructor_args)
 
         return self.deploy_contract(
             contract, deployer, constructor_args,
-            contract_name or template_name, version, description, tags
+            contract_name or template_name, version, description, tags, _now
         )
 
+    def batch_deploy(self, deployments: List[Dict[str, Any]]) -> List[str]:
+        """
+        批量部署合约（整批共用一次获取的部署时间戳）
+
+        Args:
+            deployments: 部署描述列表，每项包含 contract（合约实例）或 template（模板名），
+                以及 deployer、constructor_args、contract_name、version、description、tags
+
+        Returns:
+            与 deployments 顺序对应的合约地址列表
+        """
+        now = _coarse_now()
+        addresses = []
+
+        for deployment in deployments:
+            kwargs = {
+                "constructor_args": deployment.get("constructor_args"),
+                "contract_name": deployment.get("contract_name", ""),
+                "version": deployment.get("version", "1.0.0"),
+                "description": deployment.get("description", ""),
+                "tags": deployment.get("tags"),
+                "_now": now
+            }
+
+            if "template" in deployment:
+                address = self.deploy_from_template(
+                    deployment["template"], deployment["deployer"], **kwargs)
+            else:
+                address = self.deploy_contract(
+                    deployment["contract"], deployment["deployer"], **kwargs)
+            addresses.append(address)
+
+        return addresses
+
     def call_contract(self, address: str, function_name: str,
                       args: List[Any] = None, caller: str = "0x0",
                       value: int = 0) -> Any:
         """调用合约函数"""
-        return self.vm.call_contract(address, function_name, args, caller, value)
+        return self._vm_call(address, function_name, args, caller, value)
 
     def get_contract(self, address: str) -> Optional[SmartContract]:
         """获取合约实例"""
-        return self.vm.get_contract(address)
+        return self._vm_get(address)
 
     def get_contract_info(self, address: str) -> Optional[ContractInfo]:
         """获取合约注册信息"""
         return self.registry.get_info(address)
 
     def find_contracts(self, name: str = None, tag: str = None,
-                       version: str = None) -> List[ContractInfo]:
-        """查找合约"""
-        if name:
+                       version: str = None, tags: List[str] = None) -> List[ContractInfo]:
+        """
+        查找合约
+
+        只指定名称或单个标签时直接走对应索引；名称与标签组合、或指定多个标签时
+        对各索引求交集。查询条件固定的循环中可直接调用 registry.find_by_name /
+        find_by_tag / find_by_filters / list_all，省去每次调用时的条件判断
+
+        Args:
+            name: 合约名称
+            tag: 标签
+            version: 版本号（仅与名称一起使用）
+            tags: 需全部包含的标签列表
+
+        Returns:
+            匹配的合约信息列表
+        """
+        if tags or (name and tag):
+            all_tags = list(tags or [])
+            if tag:
+                all_tags.append(tag)
+            return self.registry.find_by_filters(name, all_tags, version if name else None)
+        elif name:
             return self.registry.find_by_name(name, version)
         elif tag:
             return self.registry.find_by_tag(tag)
@@ -233,63 +414,103 @@ class ContractManager:
         return new_address
 
     def batch_call(self, calls: List[Dict[str, Any]]) -> List[Any]:
-        """批量调用合约函数"""
-        results = []
-
-        for call in calls:
-            try:
-                result = self.call_contract(
-                    call.get("address"),
-                    call.get("function"),
-                    call.get("args", []),
-                    call.get("caller", "0x0"),
-                    call.get("value", 0)
-                )
-                results.append({"success": True, "result": result})
-            except Exception as e:
-                results.append({"success": False, "error": str(e)})
-
-        return results
+        """
+        批量调用合约函数
+
+        按顺序逐个执行：虚拟机以同一把锁串行化所有调用，并发执行无法缩短总耗时
+
+        Args:
+            calls: 调用描述列表（address、function、args、caller、value）
+
+        Returns:
+            与 calls 顺序对应的结果列表
+        """
+        # 先统一转换为 CallSpec，执行时直接访问属性
+        return [self._invoke_call(CallSpec.from_dict(call)) for call in calls]
+
+    def _invoke_call(self, spec: CallSpec) -> Dict[str, Any]:
+        """执行单个批量调用，异常转换为失败结果而不中断整个批次"""
+        try:
+            result = self._vm_call(
+                spec.address, spec.function, spec.args, spec.caller, spec.value)
+            return {"success": True, "result": result}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
     def export_contracts(self, addresses: List[str] = None) -> Dict[str, Any]:
         """导出合约数据"""
-        if addresses is None:
-            addresses = list(self.registry.contracts.keys())
-
-        export_data = {
-            "timestamp": int(time.time()),
-            "contracts": {}
+        return {
+            "timestamp": _coarse_now(),
+            "contracts": dict(self._iter_export_entries(addresses))
         }
 
-        for address in addresses:
-            contract = self.vm.get_contract(address)
-            contract_info = self.registry.get_info(address)
-
-            if contract and contract_info:
-                export_data["contracts"][address] = {
-                    "info": {
-                        "name": contract_info.name,
-                        "version": contract_info.version,
-                        "deployer": contract_info.deployer,
-                        "deployment_time": contract_info.deployment_time,
-                        "description": contract_info.description,
-                        "tags": contract_info.tags
-                    },
+    def export_contracts_to(self, fp: BinaryIO, addresses: List[str] = None) -> int:
+        """
+        将合约数据以JSON流式写入二进制文件对象（格式与 export_contracts 相同），
+        逐个合约序列化写出，不在内存中构建完整的导出字典
+
+        Args:
+            fp: 可写的二进制文件对象
+            addresses: 要导出的合约地址，默认导出全部
+
+        Returns:
+            导出的合约数量
+        """
+        fp.write(b'{"timestamp":%d,"contracts":{' % _coarse_now())
+
+        count = 0
+        for address, entry in self._iter_export_entries(addresses):
+            if count:
+                fp.write(b",")
+            fp.write(canonical_json(address))
+            fp.write(b":")
+            fp.write(canonical_json(entry, default=str))
+            count += 1
+
+        fp.write(b"}}")
+        return count
+
+    def _iter_export_entries(self, addresses: List[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """逐个生成 (地址, 导出数据)，跳过不存在或未注册的合约"""
+        vm_contracts = self.vm.contracts
+
+        # 导出全部合约时直接遍历注册表，省去按地址再查一次注册信息
+        if addresses is None:
+            pairs = self.registry.contracts.items()
+        else:
+            # 去重（保持首次出现的顺序）
+            registry_get = self.registry.contracts.get
+            pairs = ((address, registry_get(address)) for address in dict.fromkeys(addresses))
+
+        for address, contract_info in pairs:
+            # 未注册的地址直接跳过，不再查虚拟机
+            if contract_info is None:
+                continue
+
+            contract = vm_contracts.get(address)
+            if contract:
+                yield address, {
+                    "info": dict(zip(_EXPORT_INFO_FIELDS, _export_info_getter(contract_info))),
                     "contract": contract.to_dict()
                 }
 
-        return export_data
-
     def import_contracts(self, import_data: Dict[str, Any]):
         """导入合约数据"""
+        vm_contracts = self.vm.contracts
+        destroyed_add = self.vm.destroyed_contracts.add
+        contract_infos = []
+
         for address, data in import_data.get("contracts", {}).items():
             # 恢复合约
             contract = SmartContract.from_dict(data["contract"])
-            self.vm.contracts[address] = contract
+            vm_contracts[address] = contract
+            contract.destroy_listener = destroyed_add
+            if contract.state == ContractState.DESTROYED:
+                destroyed_add(address)
 
             # 恢复注册信息
             info_data = data["info"]
-            contract_info = ContractInfo(
+            contract_infos.append(ContractInfo(
                 name=info_data["name"],
                 version=info_data["version"],
                 address=address,
@@ -297,8 +518,10 @@ class ContractManager:
                 deployment_time=info_data["deployment_time"],
                 description=info_data["description"],
                 tags=info_data["tags"]
-            )
-            self.registry.register(contract_info)
+            ))
+
+        # 一次性批量注册
+        self.registry.bulk_register(contract_infos)
 
     def get_manager_statistics(self) -> Dict[str, Any]:
         """获取管理器统计信息"""
@@ -312,19 +535,24 @@ class ContractManager:
         }
 
     def cleanup_destroyed_contracts(self) -> int:
-        """清理已销毁的合约"""
+        """
+        清理已销毁的合约
+
+        合约状态转为 DESTROYED 时（无论经由虚拟机调用、合约的 destroy 函数还是直接设置状态）
+        都会记录到虚拟机的已销毁地址集合，这里只遍历该集合而不是全部合约
+        """
         destroyed_count = 0
-        addresses_to_remove = []
 
-        for address, contract in self.vm.contracts.items():
-            if contract.state == ContractState.DESTROYED:
-                addresses_to_remove.append(address)
+        for address in self.vm.destroyed_contracts:
+            contract = self.vm.contracts.get(address)
+            if contract is None or contract.state != ContractState.DESTROYED:
+                continue
 
-        for address in addresses_to_remove:
             del self.vm.contracts[address]
             self.registry.unregister(address)
             destroyed_count += 1
 
+        self.vm.destroyed_contracts.clear()
         return destroyed_count
 
     def __str__(self) -> str:
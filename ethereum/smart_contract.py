@@ -14,10 +14,15 @@
 import hashlib
 import json
 import time
-from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass, field
+from array import array
+from types import MappingProxyType
+from bisect import bisect_left
+from typing import Dict, List, Any, Mapping, Optional, Callable, Tuple
+from dataclasses import dataclass
 from enum import Enum
 
+from .utils import DATACLASS_SLOTS
+
 
 class ContractState(Enum):
     """合约状态"""
@@ -28,17 +33,24 @@ class ContractState(Enum):
     DESTROYED = "destroyed"
 
 
-@dataclass
+# 状态值 -> 枚举成员，反序列化时直接查表，省去 Enum.__call__ 的开销
+_STATE_BY_VALUE: Dict[str, ContractState] = {state.value: state for state in ContractState}
+
+# 允许调用函数的合约状态
+_CALLABLE_STATES = frozenset((ContractState.DEPLOYED, ContractState.ACTIVE))
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ContractEvent:
     """合约事件"""
     name: str
     args: Dict[str, Any]
     block_number: int
     transaction_hash: str
-    timestamp: int = field(default_factory=lambda: int(time.time()))
+    timestamp: int = 0
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ContractFunction:
     """合约函数"""
     name: str
@@ -52,30 +64,74 @@ class ContractFunction:
 class SmartContract:
     """智能合约类"""
 
-    def __init__(self, contract_code: str, abi: List[Dict] = None):
+    __slots__ = ('contract_code', 'abi', 'address', '_state', 'storage', 'functions',
+                 'owner', 'balance', 'creation_time', 'trace_calls',
+                 '_event_names', '_event_args', '_event_blocks', '_event_txs', '_event_ts',
+                 '_event_blocks_sorted', '_events_by_name', '_dispatch',
+                 '_storage_snapshot', '_function_names', '_info_dirty', '_info_cache',
+                 'destroy_listener')
+
+    def __init__(self, contract_code: str, abi: List[Dict] = None,
+                 address: Optional[str] = None, trace_calls: bool = False):
         """
         初始化智能合约
 
         Args:
             contract_code: 合约代码或字节码
             abi: 应用程序二进制接口
+            address: 已知的合约地址（从导出数据恢复时传入），为None时自动生成
+            trace_calls: 是否为每次函数调用记录 FunctionCalled 事件
         """
         self.contract_code = contract_code
         self.abi = abi or []
-        self.address: Optional[str] = None
-        self.state = ContractState.CREATED
+        self.address: Optional[str] = address
+        # 状态转为 DESTROYED 时以合约地址回调（虚拟机借此记录待清理的合约）
+        self.destroy_listener: Optional[Callable[[str], None]] = None
+        self._state = ContractState.CREATED
         self.storage: Dict[str, Any] = {}
-        self.events: List[ContractEvent] = []
+        # 事件按列存储（每个字段一个并行数组），过滤时只扫描用到的列
+        self._event_names: List[str] = []
+        self._event_args: List[Dict[str, Any]] = []
+        self._event_blocks = array('q')
+        self._event_txs: List[str] = []
+        self._event_ts = array('q')
+        # 区块号通常按非递减顺序追加，此时可用二分查找定位 from_block 的起点
+        self._event_blocks_sorted = True
+        # 事件名 -> 行下标列表（递增），按名称过滤时只访问匹配的行
+        self._events_by_name: Dict[str, List[int]] = {}
         self.functions: Dict[str, ContractFunction] = {}
         self.owner: Optional[str] = None
         self.balance: int = 0  # wei
         self.creation_time = int(time.time())
+        # 默认不记录调用事件，避免事件列表随调用次数无限增长
+        self.trace_calls = trace_calls
+        # 首次调用时按ABI生成的专用分派函数（ABI在构造后不再变化）
+        self._dispatch: Optional[Callable[..., Any]] = None
+        # get_storage()/get_info() 的缓存快照；存储快照在写入时失效，
+        # 合约信息在状态变化、写入存储、发射事件或调用函数时标记为脏
+        self._storage_snapshot: Optional[Mapping[str, Any]] = None
+        self._function_names: Tuple[str, ...] = ()
+        self._info_dirty = True
+        self._info_cache: Optional[Dict[str, Any]] = None
 
         # 解析ABI
         self._parse_abi()
 
         # 生成合约地址
-        self._generate_address()
+        if address is None:
+            self._generate_address()
+
+    @property
+    def state(self) -> ContractState:
+        """合约状态"""
+        return self._state
+
+    @state.setter
+    def state(self, value: ContractState):
+        self._state = value
+        self._info_dirty = True
+        if value is ContractState.DESTROYED and self.destroy_listener is not None:
+            self.destroy_listener(self.address)
 
     def _parse_abi(self):
         """解析ABI，提取函数信息"""
@@ -90,12 +146,14 @@ class SmartContract:
                     pure=item.get('stateMutability') == 'pure'
                 )
                 self.functions[func.name] = func
+        # ABI在构造后不再变化，函数名列表只需生成一次
+        self._function_names = tuple(self.functions)
 
     def _generate_address(self):
         """生成合约地址"""
         data = f"{self.contract_code}{self.creation_time}".encode()
-        hash_obj = hashlib.sha256(data)
-        self.address = "0x" + hash_obj.hexdigest()[:40]
+        # 20字节摘要直接对应地址长度，无需截断
+        self.address = "0x" + hashlib.blake2b(data, digest_size=20).hexdigest()
 
     def deploy(self, deployer_address: str, constructor_args: List[Any] = None):
         """
@@ -113,14 +171,15 @@ class SmartContract:
 
         # 执行构造函数
         if constructor_args:
-            self.storage["constructor_args"] = constructor_args
+            self.set_storage("constructor_args", constructor_args)
 
         # 发射部署事件
+        now = int(time.time())
         self.emit_event("ContractDeployed", {
             "deployer": deployer_address,
             "address": self.address,
-            "timestamp": int(time.time())
-        })
+            "timestamp": now
+        }, timestamp=now)
 
     def call_function(self, function_name: str, args: List[Any] = None,
                       caller: str = None, value: int = 0) -> Any:
@@ -136,94 +195,142 @@ class SmartContract:
         Returns:
             函数返回值
         """
-        if self.state not in [ContractState.DEPLOYED, ContractState.ACTIVE]:
+        if self._state not in _CALLABLE_STATES:
             raise ValueError("合约未部署或已暂停")
+        # 函数可能修改余额、状态或事件，合约信息需重建
+        self._info_dirty = True
 
-        args = args or []
-
-        # 检查是否是ABI中定义的函数
-        if function_name in self.functions:
-            func = self.functions[function_name]
-            # 检查payable
-            if value > 0 and not func.payable:
-                raise ValueError("函数不接受以太币")
+        dispatch = self._dispatch
+        if dispatch is None:
+            dispatch = self._dispatch = self._build_dispatch()
 
-        # 更新余额
-        if value > 0:
-            self.balance += value
+        return dispatch(self, function_name, args or [], caller, value)
 
-        # 执行函数
-        result = self._execute_function(function_name, args, caller)
+    def _build_dispatch(self) -> Callable[..., Any]:
+        """
+        根据ABI生成专用的分派函数
 
-        # 发射函数调用事件
-        self.emit_event("FunctionCalled", {
-            "function": function_name,
-            "caller": caller,
-            "args": args,
-            "value": value
-        })
+        payable 与 view/pure 信息预先汇总为集合并由闭包捕获，
+        调用时无需再查找 ContractFunction 并读取其属性
 
-        return result
+        Returns:
+            dispatch(contract, function_name, args, caller, value) 形式的函数
+        """
+        functions = self.functions
+        # ABI中声明但不接受以太币的函数（未声明的函数不做检查）
+        non_payable = frozenset(name for name, func in functions.items() if not func.payable)
+        # view/pure函数不改变状态，不记录调用事件
+        read_only = frozenset(name for name, func in functions.items() if func.view or func.pure)
+        builtins = self._BUILTINS
+
+        def dispatch(contract: 'SmartContract', function_name: str, args: List[Any],
+                     caller: str, value: int) -> Any:
+            # 检查payable并更新余额
+            if value > 0:
+                if function_name in non_payable:
+                    raise ValueError("函数不接受以太币")
+                contract.balance += value
+
+            # 执行函数
+            handler = builtins.get(function_name)
+            if handler is not None:
+                result = handler(contract, args, caller)
+            else:
+                result = contract._execute_function(function_name, args, caller)
+
+            # 发射函数调用事件（仅在开启调用追踪时）
+            if contract.trace_calls and function_name not in read_only:
+                contract.emit_event("FunctionCalled", {
+                    "function": function_name,
+                    "caller": caller,
+                    "args": args,
+                    "value": value
+                })
+
+            return result
+
+        return dispatch
 
     def _execute_function(self, function_name: str, args: List[Any], caller: str) -> Any:
         """
-        执行具体函数逻辑
+        执行非内置函数（内置函数已由分派函数直接处理）
 
-        这里实现一些示例函数，实际应用中需要根据合约代码执行
+        这里只返回示例结果，实际应用中需要根据合约代码执行
         """
-        if function_name == "get_balance":
-            return self.balance
-
-        elif function_name == "get_owner":
-            return self.owner
-
-        elif function_name == "set_value":
-            if len(args) < 2:
-                raise ValueError("参数不足")
-            key, value = args[0], args[1]
-            self.storage[key] = value
-            return True
-
-        elif function_name == "get_value":
-            if len(args) < 1:
-                raise ValueError("参数不足")
-            key = args[0]
-            return self.storage.get(key)
-
-        elif function_name == "transfer":
-            if len(args) < 2:
-                raise ValueError("参数不足")
-            to_address, amount = args[0], args[1]
-            if self.balance < amount:
-                raise ValueError("余额不足")
-            self.balance -= amount
-            # 这里应该实际转账，简化实现只是减少余额
-            return True
-
-        elif function_name == "pause":
-            if caller != self.owner:
-                raise ValueError("只有所有者可以暂停合约")
-            self.state = ContractState.PAUSED
-            return True
-
-        elif function_name == "unpause":
-            if caller != self.owner:
-                raise ValueError("只有所有者可以恢复合约")
-            self.state = ContractState.ACTIVE
-            return True
-
-        elif function_name == "destroy":
-            if caller != self.owner:
-                raise ValueError("只有所有者可以销毁合约")
-            self.state = ContractState.DESTROYED
-            return True
+        return f"执行函数 {function_name} 参数: {args}"
+
+    def _fn_get_balance(self, args: List[Any], caller: str) -> Any:
+        """内置函数：获取合约余额"""
+        return self.balance
+
+    def _fn_get_owner(self, args: List[Any], caller: str) -> Any:
+        """内置函数：获取合约所有者"""
+        return self.owner
+
+    def _fn_set_value(self, args: List[Any], caller: str) -> Any:
+        """内置函数：写入存储 (key, value)"""
+        if len(args) < 2:
+            raise ValueError("参数不足")
+        key, value = args[0], args[1]
+        self.set_storage(key, value)
+        return True
+
+    def _fn_get_value(self, args: List[Any], caller: str) -> Any:
+        """内置函数：读取存储 (key)"""
+        if len(args) < 1:
+            raise ValueError("参数不足")
+        key = args[0]
+        return self.storage.get(key)
 
-        else:
-            # 默认函数执行
-            return f"执行函数 {function_name} 参数: {args}"
+    def _fn_transfer(self, args: List[Any], caller: str) -> Any:
+        """内置函数：从合约余额转出 (to, amount)"""
+        if len(args) < 2:
+            raise ValueError("参数不足")
+        to_address, amount = args[0], args[1]
+        if self.balance < amount:
+            raise ValueError("余额不足")
+        self.balance -= amount
+        # 这里应该实际转账，简化实现只是减少余额
+        return True
+
+    def _require_owner(self, caller: str, action: str):
+        """校验调用者为合约所有者，否则抛出 ValueError"""
+        if caller != self.owner:
+            raise ValueError(f"只有所有者可以{action}")
+
+    def _fn_pause(self, args: List[Any], caller: str) -> Any:
+        """内置函数：暂停合约（仅所有者）"""
+        self._require_owner(caller, "暂停合约")
+        self.state = ContractState.PAUSED
+        return True
+
+    def _fn_unpause(self, args: List[Any], caller: str) -> Any:
+        """内置函数：恢复合约（仅所有者）"""
+        self._require_owner(caller, "恢复合约")
+        self.state = ContractState.ACTIVE
+        return True
+
+    def _fn_destroy(self, args: List[Any], caller: str) -> Any:
+        """内置函数：销毁合约（仅所有者）"""
+        self._require_owner(caller, "销毁合约")
+        self.state = ContractState.DESTROYED
+        return True
+
+    # 内置函数名 -> 处理函数，一次字典查找完成分派
+    _BUILTINS: Dict[str, Callable[['SmartContract', List[Any], str], Any]] = {
+        "get_balance": _fn_get_balance,
+        "get_owner": _fn_get_owner,
+        "set_value": _fn_set_value,
+        "get_value": _fn_get_value,
+        "transfer": _fn_transfer,
+        "pause": _fn_pause,
+        "unpause": _fn_unpause,
+        "destroy": _fn_destroy,
+    }
 
     def emit_event(self, event_name: str, event_args: Dict[str, Any],
-                   block_number: int = 0, transaction_hash: str = ""):
+                   block_number: int = 0, transaction_hash: str = "",
+                   timestamp: Optional[int] = None):
         """
         发射事件
 
@@ -232,14 +339,47 @@ class SmartContract:
             event_args: 事件参数
             block_number: 区块号
             transaction_hash: 交易哈希
+            timestamp: 事件时间戳（如所在区块的时间戳），为None时取当前时间
         """
-        event = ContractEvent(
-            name=event_name,
-            args=event_args,
-            block_number=block_number,
-            transaction_hash=transaction_hash
+        if timestamp is None:
+            timestamp = int(time.time())
+        self._append_event(event_name, event_args, block_number, transaction_hash, timestamp)
+
+    def _append_event(self, name: str, args: Dict[str, Any], block_number: int,
+                      transaction_hash: str, timestamp: int):
+        """向各事件列追加一行"""
+        blocks = self._event_blocks
+        if blocks and block_number < blocks[-1]:
+            self._event_blocks_sorted = False
+        by_name = self._events_by_name.get(name)
+        if by_name is None:
+            by_name = self._events_by_name[name] = []
+        by_name.append(len(self._event_names))
+        self._event_names.append(name)
+        self._info_dirty = True
+        self._event_args.append(args)
+        blocks.append(block_number)
+        self._event_txs.append(transaction_hash)
+        self._event_ts.append(timestamp)
+
+    def _materialize_event(self, index: int) -> ContractEvent:
+        """按下标从各列组装出 ContractEvent 对象"""
+        return ContractEvent(
+            name=self._event_names[index],
+            args=self._event_args[index],
+            block_number=self._event_blocks[index],
+            transaction_hash=self._event_txs[index],
+            timestamp=self._event_ts[index]
         )
-        self.events.append(event)
+
+    @property
+    def events(self) -> Tuple[ContractEvent, ...]:
+        """
+        全部事件（按需组装的快照）
+
+        返回不可变元组，对其 append 会直接报错而不是静默失效；新增事件请使用 emit_event
+        """
+        return tuple(self._materialize_event(i) for i in range(len(self._event_names)))
 
     def get_events(self, event_name: str = None, from_block: int = 0) -> List[ContractEvent]:
         """
@@ -252,15 +392,26 @@ class SmartContract:
         Returns:
             事件列表
         """
-        events = self.events
+        blocks = self._event_blocks
+        start = 0
+        if from_block > 0 and self._event_blocks_sorted:
+            # 区块号有序：二分定位起点后无需再逐个比较区块号
+            start = bisect_left(blocks, from_block)
+            from_block = 0
 
         if event_name:
-            events = [e for e in events if e.name == event_name]
+            indices = self._events_by_name.get(event_name, [])
+            if start:
+                # 下标列表递增，同样可二分截取
+                indices = indices[bisect_left(indices, start):]
+        else:
+            indices = range(start, len(self._event_names))
 
+        # 区块号无序时，过滤与组装在同一个推导式中完成，不生成中间列表
+        materialize = self._materialize_event
         if from_block > 0:
-            events = [e for e in events if e.block_number >= from_block]
-
-        return events
+            return [materialize(i) for i in indices if blocks[i] >= from_block]
+        return [materialize(i) for i in indices]
 
     def get_storage(self, key: str = None) -> Any:
         """
@@ -270,10 +421,13 @@ class SmartContract:
             key: 存储键，如果为None则返回所有存储
 
         Returns:
-            存储值或所有存储
+            存储值或所有存储（全部存储为缓存快照的只读视图）
         """
         if key is None:
-            return self.storage.copy()
+            snapshot = self._storage_snapshot
+            if snapshot is None:
+                snapshot = self._storage_snapshot = MappingProxyType(self.storage.copy())
+            return snapshot
         return self.storage.get(key)
 
     def set_storage(self, key: str, value: Any):
@@ -285,19 +439,28 @@ class SmartContract:
             value: 存储值
         """
         self.storage[key] = value
+        self._storage_snapshot = None
+        self._info_dirty = True
 
     def get_info(self) -> Dict[str, Any]:
-        """获取合约信息"""
-        return {
+        """获取合约信息（未标记为脏时复制缓存的字典，不再重新组装）"""
+        info = self._info_cache
+        if not self._info_dirty and info is not None:
+            return info.copy()
+
+        info = {
             "address": self.address,
             "state": self.state.value,
             "owner": self.owner,
             "balance": self.balance,
             "creation_time": self.creation_time,
-            "functions": list(self.functions.keys()),
-            "events_count": len(self.events),
+            "functions": self._function_names,
+            "events_count": len(self._event_names),
             "storage_size": len(self.storage)
         }
+        self._info_cache = info
+        self._info_dirty = False
+        return info.copy()
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -312,37 +475,39 @@ class SmartContract:
             "creation_time": self.creation_time,
             "events": [
                 {
-                    "name": e.name,
-                    "args": e.args,
-                    "block_number": e.block_number,
-                    "transaction_hash": e.transaction_hash,
-                    "timestamp": e.timestamp
+                    "name": name,
+                    "args": args,
+                    "block_number": block_number,
+                    "transaction_hash": transaction_hash,
+                    "timestamp": timestamp
                 }
-                for e in self.events
+                for name, args, block_number, transaction_hash, timestamp in zip(
+                    self._event_names, self._event_args, self._event_blocks,
+                    self._event_txs, self._event_ts)
             ]
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SmartContract':
         """从字典创建合约实例"""
-        contract = cls(data["contract_code"], data.get("abi", []))
-        contract.address = data["address"]
-        contract.state = ContractState(data["state"])
+        contract = cls(data["contract_code"], data.get("abi", []), address=data["address"])
+        contract.state = _STATE_BY_VALUE[data["state"]]
         contract.storage = data.get("storage", {})
+        contract._storage_snapshot = None
+        contract._info_dirty = True
         contract.owner = data.get("owner")
         contract.balance = data.get("balance", 0)
         contract.creation_time = data.get("creation_time", int(time.time()))
 
         # 恢复事件
         for event_data in data.get("events", []):
-            event = ContractEvent(
-                name=event_data["name"],
-                args=event_data["args"],
-                block_number=event_data["block_number"],
-                transaction_hash=event_data["transaction_hash"],
-                timestamp=event_data["timestamp"]
+            contract._append_event(
+                event_data["name"],
+                event_data["args"],
+                event_data["block_number"],
+                event_data["transaction_hash"],
+                event_data["timestamp"]
             )
-            contract.events.append(event)
 
         return contract
 
@@ -12,11 +12,45 @@
 """
 
 import re
+import sys
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import struct
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Any, Tuple
 from dataclasses import dataclass
 
 
+# 预编译的正则表达式，避免每次编译时重复查找/编译模式
+_RE_LINE_COMMENT = re.compile(r'//.*?\n')
+_RE_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_RE_CONTRACT_HEADER = re.compile(r'contract\s+(\w+)\s*(?:is\s+[\w\s,]+)?\s*\{')
+# 合约成员（函数、事件、构造函数、状态变量）合并为一个模式，单次扫描合约体
+_RE_MEMBER = re.compile(
+    r'(?P<function>function\s+(?P<fn_name>\w+)\s*\((?P<fn_params>[^)]*)\)\s*'
+    r'(?P<fn_visibility>public|private|internal|external)?\s*'
+    r'(?P<fn_mutability>view|pure|payable)?\s*'
+    r'(?:returns\s*\((?P<fn_returns>[^)]*)\))?\s*\{)'
+    r'|(?P<event>event\s+(?P<ev_name>\w+)\s*\((?P<ev_params>[^)]*)\)\s*;)'
+    r'|(?P<constructor>constructor\s*\((?P<ctor_params>[^)]*)\)\s*'
+    r'(?:public|private|internal|external)?\s*\{)'
+    r'|(?P<variable>(?P<var_type>\w+)\s+(?P<var_visibility>public|private|internal)?\s*'
+    r'(?P<var_name>\w+)\s*(?:=\s*[^;]+)?\s*;)')
+
+# 可识别的状态变量类型（驻留后，与解析出的已驻留类型字符串比较时可直接按指针判等）
+_STATE_VARIABLE_TYPES = frozenset(
+    sys.intern(t) for t in ('uint256', 'uint', 'int', 'string', 'bool', 'address'))
+
+# 函数名 -> 模拟的4字节选择器，跨合约、跨编译复用
+_SELECTOR_CACHE: Dict[str, bytes] = {}
+
+# 模拟字节码的固定片段
+_BYTECODE_HEADER = bytes.fromhex("608060405234801561001057600080fd5b50")
+_BYTECODE_CONSTRUCTOR = bytes.fromhex("6001600081905550")
+_BYTECODE_TRAILER = bytes.fromhex(
+    "00a2646970667358221220" + "00" * 32 + "64736f6c63430008000033")  # 含元数据哈希占位符
+
+
 class CompilerError(Exception):
     """编译器错误"""
     pass
@@ -34,8 +68,12 @@ class CompilerOutput:
 class SolidityCompiler:
     """Solidity编译器"""
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 128):
         self.version = "0.8.0"
+        # 源码摘要 -> (编译输出, 合约名列表)，按最近使用顺序淘汰
+        self._compile_cache: "OrderedDict[bytes, Tuple[CompilerOutput, List[str]]]" = \
+            OrderedDict()
+        self._cache_size = cache_size
 
     def compile(self, source_code: str) -> CompilerOutput:
         """
@@ -47,6 +85,44 @@ class SolidityCompiler:
         Returns:
             编译输出
         """
+        output, _ = self._compile_cached(source_code)
+        # 返回列表副本，调用方修改结果不会污染缓存
+        return CompilerOutput(output.bytecode, list(output.abi),
+                              list(output.warnings), list(output.errors))
+
+    def _compile_cached(self, source_code: str) -> Tuple[CompilerOutput, List[str]]:
+        """
+        带LRU缓存的编译，相同源码只编译一次
+
+        Args:
+            source_code: Solidity源代码
+
+        Returns:
+            (编译输出, 源码中所有合约名)
+        """
+        key = hashlib.blake2b(source_code.encode(), digest_size=16).digest()
+        cache = self._compile_cache
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            return cached
+
+        cached = self._compile_source(source_code)
+        cache[key] = cached
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+        return cached
+
+    def _compile_source(self, source_code: str) -> Tuple[CompilerOutput, List[str]]:
+        """
+        实际执行编译（不经过缓存）
+
+        Args:
+            source_code: Solidity源代码
+
+        Returns:
+            (编译输出, 源码中所有合约名)
+        """
         warnings = []
         errors = []
 
@@ -59,7 +135,7 @@ class SolidityCompiler:
 
             if not contracts:
                 errors.append("未找到合约定义")
-                return CompilerOutput("", [], warnings, errors)
+                return CompilerOutput("", [], warnings, errors), []
 
             # 编译第一个合约
             contract = contracts[0]
@@ -70,138 +146,152 @@ class SolidityCompiler:
             # 生成字节码（模拟）
             bytecode = self._generate_bytecode(contract)
 
-            return CompilerOutput(bytecode, abi, warnings, errors)
+            names = [c["name"] for c in contracts]
+            return CompilerOutput(bytecode, abi, warnings, errors), names
 
         except Exception as e:
             errors.append(str(e))
-            return CompilerOutput("", [], warnings, errors)
+            return CompilerOutput("", [], warnings, errors), []
 
     def _preprocess(self, source_code: str) -> str:
         """预处理源代码"""
         # 移除注释
-        source_code = re.sub(r'//.*?\n', '\n', source_code)
-        source_code = re.sub(r'/\*.*?\*/', '', source_code, flags=re.DOTALL)
+        source_code = _RE_LINE_COMMENT.sub('\n', source_code)
+        source_code = _RE_BLOCK_COMMENT.sub('', source_code)
 
-        # 移除多余的空白
-        source_code = re.sub(r'\s+', ' ', source_code)
-
-        return source_code.strip()
+        # 合并空白并去除首尾空白：split/join 一次完成，比正则替换加 strip 快数倍
+        return ' '.join(source_code.split())
 
     def _parse_contracts(self, source_code: str) -> List[Dict[str, Any]]:
         """解析合约"""
         contracts = []
 
         # 查找合约定义
-        contract_pattern = r'contract\s+(\w+)\s*(?:is\s+[\w\s,]+)?\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}'
-        matches = re.finditer(contract_pattern, source_code)
-
-        for match in matches:
-            contract_name = match.group(1)
-            contract_body = match.group(2)
-
-            contract = {
-                "name": contract_name,
-                "constructor": self._parse_constructor(contract_body),
-                "functions": self._parse_functions(contract_body),
-                "events": self._parse_events(contract_body),
-                "state_variables": self._parse_state_variables(contract_body)
-            }
-
+        for contract_name, contract_body in self._find_contract_bodies(source_code):
+            contract = {"name": contract_name}
+            contract.update(self._parse_members(contract_body))
             contracts.append(contract)
 
         return contracts
 
-    def _parse_constructor(self, contract_body: str) -> Optional[Dict[str, Any]]:
-        """解析构造函数"""
-        constructor_pattern = r'constructor\s*\(([^)]*)\)\s*(?:public|private|internal|external)?\s*\{'
-        match = re.search(constructor_pattern, contract_body)
-
-        if match:
-            params_str = match.group(1)
-            params = self._parse_parameters(params_str)
-
-            return {
-                "type": "constructor",
-                "inputs": params
-            }
+    def _parse_members(self, contract_body: str) -> Dict[str, Any]:
+        """
+        单次扫描合约体，按匹配到的分支分别解析函数、事件、构造函数和状态变量
 
-        return None
+        Args:
+            contract_body: 合约体源代码
 
-    def _parse_functions(self, contract_body: str) -> List[Dict[str, Any]]:
-        """解析函数"""
+        Returns:
+            包含 constructor、functions、events、state_variables 的字典
+        """
+        constructor = None
         functions = []
-
-        function_pattern = r'function\s+(\w+)\s*\(([^)]*)\)\s*(public|private|internal|external)?\s*(view|pure|payable)?\s*(?:returns\s*\(([^)]*)\))?\s*\{'
-        matches = re.finditer(function_pattern, contract_body)
-
-        for match in matches:
-            function_name = match.group(1)
-            params_str = match.group(2) or ""
-            visibility = match.group(3) or "public"
-            state_mutability = match.group(4) or "nonpayable"
-            returns_str = match.group(5) or ""
-
-            inputs = self._parse_parameters(params_str)
-            outputs = self._parse_parameters(returns_str)
-
-            function = {
-                "type": "function",
-                "name": function_name,
-                "inputs": inputs,
-                "outputs": outputs,
-                "stateMutability": state_mutability if state_mutability != "payable" else "payable",
-                "payable": state_mutability == "payable"
-            }
-
-            functions.append(function)
-
-        return functions
-
-    def _parse_events(self, contract_body: str) -> List[Dict[str, Any]]:
-        """解析事件"""
         events = []
+        variables = []
 
-        event_pattern = r'event\s+(\w+)\s*\(([^)]*)\)\s*;'
-        matches = re.finditer(event_pattern, contract_body)
-
-        for match in matches:
-            event_name = match.group(1)
-            params_str = match.group(2) or ""
-
-            inputs = self._parse_parameters(params_str, is_event=True)
-
-            event = {
-                "type": "event",
-                "name": event_name,
-                "inputs": inputs
-            }
-
-            events.append(event)
+        for match in _RE_MEMBER.finditer(contract_body):
+            kind = match.lastgroup
+            if kind == "function":
+                functions.append(self._parse_function(match))
+            elif kind == "event":
+                events.append(self._parse_event(match))
+            elif kind == "constructor":
+                # 只取第一个构造函数
+                if constructor is None:
+                    constructor = self._parse_constructor(match)
+            elif sys.intern(match.group("var_type")) in _STATE_VARIABLE_TYPES:
+                variables.append(self._parse_state_variable(match))
+
+        return {
+            "constructor": constructor,
+            "functions": functions,
+            "events": events,
+            "state_variables": variables
+        }
+
+    @staticmethod
+    def _find_contract_bodies(source_code: str) -> Iterator[Tuple[str, str]]:
+        """
+        查找合约定义，通过括号计数找到与合约头匹配的右括号（单次线性扫描，支持任意嵌套深度）
 
-        return events
+        Args:
+            source_code: 预处理后的源代码
 
-    def _parse_state_variables(self, contract_body: str) -> List[Dict[str, Any]]:
-        """解析状态变量"""
-        variables = []
+        Returns:
+            (合约名, 合约体) 迭代器
+        """
+        pos = 0
+        while True:
+            header = _RE_CONTRACT_HEADER.search(source_code, pos)
+            if not header:
+                return
+
+            start = header.end()
+            index = start
+            depth = 1
+            next_open = source_code.find('{', index)
+            while depth:
+                next_close = source_code.find('}', index)
+                if next_close < 0:
+                    return  # 后面已没有右括号，其余合约也不可能闭合
+
+                if 0 <= next_open < next_close:
+                    depth += 1
+                    index = next_open + 1
+                    next_open = source_code.find('{', index)
+                else:
+                    depth -= 1
+                    index = next_close + 1
 
-        # 简化的状态变量解析
-        variable_pattern = r'(\w+)\s+(public|private|internal)?\s*(\w+)\s*(?:=\s*[^;]+)?\s*;'
-        matches = re.finditer(variable_pattern, contract_body)
+            yield header.group(1), source_code[start:index - 1]
+            pos = index
 
-        for match in matches:
-            var_type = match.group(1)
-            visibility = match.group(2) or "internal"
-            var_name = match.group(3)
+    def _parse_constructor(self, match: re.Match) -> Dict[str, Any]:
+        """解析构造函数"""
+        params = self._parse_parameters(match.group("ctor_params"))
 
-            if var_type in ['uint256', 'uint', 'int', 'string', 'bool', 'address']:
-                variable = {
-                    "name": var_name,
-                    "type": var_type,
-                    "visibility": visibility
-                }
-                variables.append(variable)
+        return {
+            "type": "constructor",
+            "inputs": params
+        }
 
-        return variables
+    def _parse_function(self, match: re.Match) -> Dict[str, Any]:
+        """解析函数"""
+        function_name = match.group("fn_name")
+        params_str = match.group("fn_params") or ""
+        state_mutability = match.group("fn_mutability") or "nonpayable"
+        returns_str = match.group("fn_returns") or ""
+
+        inputs = self._parse_parameters(params_str)
+        outputs = self._parse_parameters(returns_str)
+
+        return {
+            "type": "function",
+            "name": function_name,
+            "inputs": inputs,
+            "outputs": outputs,
+            "stateMutability": state_mutability if state_mutability != "payable" else "payable",
+            "payable": state_mutability == "payable"
+        }
+
+    def _parse_event(self, match: re.Match) -> Dict[str, Any]:
+        """解析事件"""
+        params_str = match.group("ev_params") or ""
+        inputs = self._parse_parameters(params_str, is_event=True)
+
+        return {
+            "type": "event",
+            "name": match.group("ev_name"),
+            "inputs": inputs
+        }
+
+    def _parse_state_variable(self, match: re.Match) -> Dict[str, Any]:
+        """解析状态变量（简化解析）"""
+        return {
+            "name": match.group("var_name"),
+            "type": sys.intern(match.group("var_type")),
+            "visibility": match.group("var_visibility") or "internal"
+        }
 
     def _parse_parameters(self, params_str: str, is_event: bool = False) -> List[Dict[str, str]]:
         """解析参数"""
@@ -217,7 +307,8 @@ class SolidityCompiler:
 
             parts = param.split()
             if len(parts) >= 2:
-                param_type = parts[0]
+                # ABI类型字符串高度重复，驻留以共享同一对象
+                param_type = sys.intern(parts[0])
                 param_name = parts[1]
 
                 param_info = {
@@ -249,30 +340,44 @@ class SolidityCompiler:
         return abi
 
     def _generate_bytecode(self, contract: Dict[str, Any]) -> str:
-        """生成字节码（模拟）"""
+        """生成字节码（模拟），返回0x前缀的十六进制字符串"""
+        return "0x" + self._generate_bytecode_bytes(contract).hex()
+
+    def _generate_bytecode_bytes(self, contract: Dict[str, Any]) -> bytes:
+        """生成原始字节形式的字节码（模拟）"""
         # 这里是模拟的字节码生成
         # 实际的编译器会生成真正的EVM字节码
 
-        bytecode_parts = ["608060405234801561001057600080fd5b50"]  # 基础字节码头部
+        buf = bytearray(_BYTECODE_HEADER)  # 基础字节码头部
 
         # 为每个函数添加字节码段
         for func in contract["functions"]:
-            func_hash = hex(hash(func["name"]) & 0xFFFFFFFF)[2:].zfill(8)
-            bytecode_parts.append(func_hash)
+            name = func["name"]
+            selector = _SELECTOR_CACHE.get(name)
+            if selector is None:
+                selector = _SELECTOR_CACHE[name] = struct.pack('>I', hash(name) & 0xFFFFFFFF)
+            buf += selector
 
         # 添加构造函数字节码
         if contract["constructor"]:
-            bytecode_parts.append("6001600081905550")
+            buf += _BYTECODE_CONSTRUCTOR
 
         # 添加结尾
-        bytecode_parts.append("00a2646970667358221220")
-        bytecode_parts.append("0" * 64)  # 元数据哈希占位符
-        bytecode_parts.append("64736f6c63430008000033")
+        buf += _BYTECODE_TRAILER
 
-        return "0x" + "".join(bytecode_parts)
+        return bytes(buf)
 
-    def compile_standard_json(self, input_json: str) -> str:
-        """编译标准JSON输入"""
+    def compile_standard_json(self, input_json: str, pretty: bool = False) -> str:
+        """
+        编译标准JSON输入
+
+        Args:
+            input_json: 标准JSON格式的编译输入
+            pretty: 是否缩进输出；默认输出紧凑JSON，供程序读取
+
+        Returns:
+            标准JSON格式的编译输出
+        """
         try:
             input_data = json.loads(input_json)
             sources = input_data.get("sources", {})
@@ -286,15 +391,13 @@ class SolidityCompiler:
             for source_name, source_info in sources.items():
                 source_code = source_info.get("content", "")
 
-                compile_result = self.compile(source_code)
+                compile_result, contract_names = self._compile_cached(source_code)
 
                 if compile_result.errors:
                     output["errors"].extend(compile_result.errors)
                 else:
-                    contracts = self._parse_contracts(self._preprocess(source_code))
-
-                    for contract in contracts:
-                        contract_key = f"{source_name}:{contract['name']}"
+                    for contract_name in contract_names:
+                        contract_key = f"{source_name}:{contract_name}"
                         output["contracts"][contract_key] = {
                             "abi": compile_result.abi,
                             "evm": {
@@ -304,13 +407,20 @@ class SolidityCompiler:
                             }
                         }
 
-            return json.dumps(output, indent=2)
+            return self._dump_json(output, pretty)
 
         except Exception as e:
             error_output = {
                 "errors": [{"type": "JSONError", "message": str(e)}]
             }
-            return json.dumps(error_output, indent=2)
+            return self._dump_json(error_output, pretty)
+
+    @staticmethod
+    def _dump_json(data: Dict[str, Any], pretty: bool) -> str:
+        """序列化JSON输出：缩进格式走纯Python编码路径，较慢，仅在需要时使用"""
+        if pretty:
+            return json.dumps(data, indent=2)
+        return json.dumps(data, separators=(',', ':'))
 
     def get_version(self) -> str:
         """获取编译器版本"""
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🔧 以太坊工具函数
+
+以太坊模块共用的哈希等工具函数
+"""
+
+import json
+import sys
+from typing import Any, Callable, Optional
+
+import orjson
+from Crypto.Hash import keccak
+
+# dataclass(slots=True) 需要 Python 3.10+，旧版本退化为普通 dataclass
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def keccak256(data: bytes) -> bytes:
+    """
+    计算Keccak-256哈希（以太坊使用的哈希算法，与标准SHA3-256填充不同）
+
+    Args:
+        data: 要计算哈希的字节数据
+
+    Returns:
+        32字节哈希值
+    """
+    return keccak.new(data=data, digest_bits=256).digest()
+
+
+def canonical_json(data: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    将数据序列化为键有序、无多余空白的JSON字节串（用于导出等不参与哈希的场景）
+
+    优先使用orjson；orjson不支持超过64位的整数（wei金额很容易超出），
+    此时退回标准库json。两条路径对整数和字符串的输出一致，但浮点数的
+    指数写法不同（orjson 为 1e16，json 为 1e+16），计算哈希请使用 hash_json
+
+    Args:
+        data: 要序列化的数据
+        default: 无法直接序列化的对象的转换函数
+
+    Returns:
+        UTF-8编码的JSON字节串
+    """
+    try:
+        return orjson.dumps(data, default=default, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return hash_json(data, default)
+
+
+def hash_json(data: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    将数据序列化为哈希原像：键有序、无多余空白的JSON字节串
+
+    始终使用标准库json，同一数据不会因其他字段是否超出64位而选择
+    不同的编码器，浮点数等的写法因此固定
+
+    Args:
+        data: 要序列化的数据
+        default: 无法直接序列化的对象的转换函数
+
+    Returns:
+        UTF-8编码的JSON字节串
+    """
+    return json.dumps(
+        data, default=default, sort_keys=True,
+        separators=(",", ":"), ensure_ascii=False).encode()
@@ -11,11 +11,15 @@
 - 错误处理
 """
 
+import logging
+import threading
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
-from .smart_contract import SmartContract, ContractState
+from .smart_contract import SmartContract
+from .utils import DATACLASS_SLOTS
 
 
 class VMError(Exception):
@@ -23,43 +27,97 @@ class VMError(Exception):
     pass
 
 
+# 每次部署/调用的成功信息走调试日志，默认不输出
+_log = logging.getLogger(__name__)
+
+# 写日志中表示“写入前键不存在”的哨兵
+_MISSING = object()
+
+
+# Gas价格常量（模块级全局变量，热路径中无需经过类属性查找）
+_BASE_GAS = 21000
+_CONTRACT_CREATION_GAS = 32000
+_STORAGE_SET_GAS = 20000
+_STORAGE_CLEAR_GAS = 5000
+_STORAGE_READ_GAS = 200
+_MEMORY_GAS = 3
+_COMPUTATION_GAS = 5
+
+# 参数个数 -> 函数调用Gas费用（常见的0~8个参数）
+_CALL_GAS_TABLE = tuple(
+    _BASE_GAS + _COMPUTATION_GAS * (args_count + 1) for args_count in range(9))
+
+# 存储操作 -> Gas费用
+_STORAGE_GAS_TABLE = {
+    "set": _STORAGE_SET_GAS,
+    "clear": _STORAGE_CLEAR_GAS,
+    "read": _STORAGE_READ_GAS,
+}
+
+# 会触发存储操作的函数名 -> 存储操作类型
+_STORAGE_OPERATIONS = {
+    "set_value": "set",
+    "set": "set",
+    "get_value": "read",
+    "get": "read",
+}
+
+
+def _deployment_gas(code_size: int) -> int:
+    """计算部署合约的Gas费用"""
+    return _CONTRACT_CREATION_GAS + (code_size * 200)
+
+
+def _function_call_gas(args_count: int) -> int:
+    """计算函数调用的Gas费用"""
+    if 0 <= args_count < len(_CALL_GAS_TABLE):
+        return _CALL_GAS_TABLE[args_count]
+    return _BASE_GAS + _COMPUTATION_GAS * (args_count + 1)
+
+
+def _total_call_gas(function_name: str, args_count: int) -> int:
+    """计算函数调用的总Gas费用（调用费用加上存储操作的额外费用）"""
+    gas = _function_call_gas(args_count)
+    storage_operation = _STORAGE_OPERATIONS.get(function_name)
+    if storage_operation is not None:
+        gas += _STORAGE_GAS_TABLE[storage_operation]
+    return gas
+
+
 class Gas:
-    """Gas计算类"""
+    """Gas计算类（对模块级常量与计算函数的兼容封装）"""
 
     # Gas价格常量
-    BASE_GAS = 21000
-    CONTRACT_CREATION_GAS = 32000
-    STORAGE_SET_GAS = 20000
-    STORAGE_CLEAR_GAS = 5000
-    STORAGE_READ_GAS = 200
-    MEMORY_GAS = 3
-    COMPUTATION_GAS = 5
+    BASE_GAS = _BASE_GAS
+    CONTRACT_CREATION_GAS = _CONTRACT_CREATION_GAS
+    STORAGE_SET_GAS = _STORAGE_SET_GAS
+    STORAGE_CLEAR_GAS = _STORAGE_CLEAR_GAS
+    STORAGE_READ_GAS = _STORAGE_READ_GAS
+    MEMORY_GAS = _MEMORY_GAS
+    COMPUTATION_GAS = _COMPUTATION_GAS
 
     @classmethod
     def calculate_deployment_gas(cls, code_size: int) -> int:
         """计算部署合约的Gas费用"""
-        return cls.CONTRACT_CREATION_GAS + (code_size * 200)
+        return _deployment_gas(code_size)
 
     @classmethod
     def calculate_function_call_gas(cls, function_name: str, args_count: int) -> int:
         """计算函数调用的Gas费用"""
-        base_gas = cls.BASE_GAS
-        computation_gas = cls.COMPUTATION_GAS * (args_count + 1)
-        return base_gas + computation_gas
+        return _function_call_gas(args_count)
 
     @classmethod
     def calculate_storage_gas(cls, operation: str) -> int:
         """计算存储操作的Gas费用"""
-        if operation == "set":
-            return cls.STORAGE_SET_GAS
-        elif operation == "clear":
-            return cls.STORAGE_CLEAR_GAS
-        elif operation == "read":
-            return cls.STORAGE_READ_GAS
-        return 0
+        return _STORAGE_GAS_TABLE.get(operation, 0)
+
+    @classmethod
+    def total_call_gas(cls, function_name: str, args_count: int) -> int:
+        """计算函数调用的总Gas费用（调用费用加上存储操作的额外费用）"""
+        return _total_call_gas(function_name, args_count)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ExecutionContext:
     """执行上下文"""
     caller: str
@@ -86,9 +144,16 @@ class EthereumVM:
 
     def __init__(self):
         self.contracts: Dict[str, SmartContract] = {}
+        self.destroyed_contracts: Set[str] = set()  # 已销毁但尚未清理的合约地址
         self.accounts: Dict[str, int] = {}  # 地址 -> 余额(wei)
+        self._total_balance = 0  # 所有账户余额之和，随余额变动增量维护
+        # 当前检查点的写日志：(目标字典, 键, 写入前的值)，未开启检查点时为None
+        self._journal: Optional[List[Tuple[Dict[str, Any], str, Any]]] = None
         self.block_number = 0
         self.gas_price = 20000000000  # 20 Gwei
+        self.last_gas_used = 0  # 最近一次部署/调用实际消耗的Gas
+        # 保护账户、合约表和Gas记录的可重入锁（ContractManager.batch_call 会在多个线程中调用）
+        self._lock = threading.RLock()
 
     def deploy_contract(self, contract: SmartContract, constructor_args: List[Any] = None,
                         deployer: str = "0x0", gas_limit: int = 3000000) -> str:
@@ -104,6 +169,12 @@ class EthereumVM:
         Returns:
             合约地址
         """
+        with self._lock:
+            return self._deploy_contract(contract, constructor_args, deployer, gas_limit)
+
+    def _deploy_contract(self, contract: SmartContract, constructor_args: Optional[List[Any]],
+                         deployer: str, gas_limit: int) -> str:
+        """部署智能合约（调用方需持有 _lock）"""
         # 创建执行上下文
         context = ExecutionContext(
             caller=deployer,
@@ -115,17 +186,20 @@ class EthereumVM:
 
         try:
             # 计算部署Gas费用
-            deployment_gas = Gas.calculate_deployment_gas(len(contract.contract_code))
+            deployment_gas = _deployment_gas(len(contract.contract_code))
             context.consume_gas(deployment_gas)
 
             # 部署合约
             contract.deploy(deployer, constructor_args)
 
             # 存储合约
+            self._record_write(self.contracts, contract.address)
             self.contracts[contract.address] = contract
+            contract.destroy_listener = self.destroyed_contracts.add
+            self.last_gas_used = context.gas_used
 
-            print(f"✅ 合约部署成功: {contract.address}")
-            print(f"⛽ Gas使用: {context.gas_used}/{context.gas_limit}")
+            _log.debug("✅ 合约部署成功: %s", contract.address)
+            _log.debug("⛽ Gas使用: %s/%s", context.gas_used, context.gas_limit)
 
             return contract.address
 
@@ -149,10 +223,18 @@ class EthereumVM:
         Returns:
             函数返回值
         """
-        if contract_address not in self.contracts:
+        with self._lock:
+            return self._call_contract(contract_address, function_name, args, caller, value,
+                                       gas_limit)
+
+    def _call_contract(self, contract_address: str, function_name: str,
+                       args: Optional[List[Any]], caller: str, value: int,
+                       gas_limit: int) -> Any:
+        """调用合约函数（调用方需持有 _lock）"""
+        contract = self.contracts.get(contract_address)
+        if contract is None:
             raise VMError(f"合约不存在: {contract_address}")
 
-        contract = self.contracts[contract_address]
         args = args or []
 
         # 创建执行上下文
@@ -166,30 +248,25 @@ class EthereumVM:
         )
 
         try:
-            # 计算函数调用Gas费用
-            call_gas = Gas.calculate_function_call_gas(function_name, len(args))
-            context.consume_gas(call_gas)
+            # 计算函数调用Gas费用（含存储操作），执行前一次性扣除
+            context.consume_gas(_total_call_gas(function_name, len(args)))
 
             # 检查余额（如果发送以太币）
             if value > 0:
                 caller_balance = self.accounts.get(caller, 0)
                 if caller_balance < value:
                     raise VMError("余额不足")
+                self._record_write(self.accounts, caller)
                 self.accounts[caller] = caller_balance - value
+                # 以太币转入合约，离开账户余额
+                self._total_balance -= value
 
             # 调用合约函数
             result = contract.call_function(function_name, args, caller, value)
+            self.last_gas_used = context.gas_used
 
-            # 如果是存储操作，计算额外Gas
-            if function_name in ["set_value", "set"]:
-                storage_gas = Gas.calculate_storage_gas("set")
-                context.consume_gas(storage_gas)
-            elif function_name in ["get_value", "get"]:
-                storage_gas = Gas.calculate_storage_gas("read")
-                context.consume_gas(storage_gas)
-
-            print(f"✅ 函数调用成功: {function_name}")
-            print(f"⛽ Gas使用: {context.gas_used}/{context.gas_limit}")
+            _log.debug("✅ 函数调用成功: %s", function_name)
+            _log.debug("⛽ Gas使用: %s/%s", context.gas_used, context.gas_limit)
 
             return result
 
@@ -202,23 +279,26 @@ class EthereumVM:
 
     def get_contract_info(self, address: str) -> Dict[str, Any]:
         """获取合约信息"""
-        if address not in self.contracts:
+        contract = self.contracts.get(address)
+        if contract is None:
             raise VMError(f"合约不存在: {address}")
 
-        contract = self.contracts[address]
         return contract.get_info()
 
     def get_contract_events(self, address: str, event_name: str = None) -> List:
         """获取合约事件"""
-        if address not in self.contracts:
+        contract = self.contracts.get(address)
+        if contract is None:
             raise VMError(f"合约不存在: {address}")
 
-        contract = self.contracts[address]
         return contract.get_events(event_name)
 
     def set_account_balance(self, address: str, balance: int):
         """设置账户余额"""
-        self.accounts[address] = balance
+        with self._lock:
+            self._total_balance += balance - self.accounts.get(address, 0)
+            self._record_write(self.accounts, address)
+            self.accounts[address] = balance
 
     def get_account_balance(self, address: str) -> int:
         """获取账户余额"""
@@ -226,15 +306,53 @@ class EthereumVM:
 
     def transfer(self, from_address: str, to_address: str, amount: int) -> bool:
         """转账"""
-        from_balance = self.accounts.get(from_address, 0)
-        if from_balance < amount:
-            raise VMError("余额不足")
+        with self._lock:
+            from_balance = self.accounts.get(from_address, 0)
+            if from_balance < amount:
+                raise VMError("余额不足")
 
-        self.accounts[from_address] = from_balance - amount
-        self.accounts[to_address] = self.accounts.get(to_address, 0) + amount
+            # 账户间转账不改变余额总和
+            self._record_write(self.accounts, from_address)
+            self._record_write(self.accounts, to_address)
+            self.accounts[from_address] = from_balance - amount
+            self.accounts[to_address] = self.accounts.get(to_address, 0) + amount
 
         return True
 
+    def _record_write(self, target: Dict[str, Any], key: str):
+        """开启检查点时，记录键在写入前的值"""
+        journal = self._journal
+        if journal is not None:
+            journal.append((target, key, target.get(key, _MISSING)))
+
+    @contextmanager
+    def _checkpoint(self) -> Iterator[None]:
+        """
+        状态检查点：块内出现异常时按写日志逆序回滚账户和合约表，然后重新抛出
+
+        只记录实际写入的键，开销与写入次数成正比，而非与状态大小成正比。
+        嵌套使用时，内层成功后其日志并入外层，以便外层仍可整体回滚
+        """
+        outer_journal = self._journal
+        journal: List[Tuple[Dict[str, Any], str, Any]] = []
+        total_balance = self._total_balance
+        self._journal = journal
+        try:
+            yield
+        except BaseException:
+            for target, key, old_value in reversed(journal):
+                if old_value is _MISSING:
+                    target.pop(key, None)
+                else:
+                    target[key] = old_value
+            self._total_balance = total_balance
+            raise
+        else:
+            if outer_journal is not None:
+                outer_journal.extend(journal)
+        finally:
+            self._journal = outer_journal
+
     def next_block(self):
         """下一个区块"""
         self.block_number += 1
@@ -246,7 +364,7 @@ class EthereumVM:
             "gas_price": self.gas_price,
             "contracts_count": len(self.contracts),
             "accounts_count": len(self.accounts),
-            "total_balance": sum(self.accounts.values()),
+            "total_balance": self._total_balance,
             "contracts": {
                 addr: contract.get_info()
                 for addr, contract in self.contracts.items()
@@ -269,54 +387,51 @@ class EthereumVM:
 
     def simulate_transaction(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """模拟交易执行"""
-        # 创建VM副本进行模拟
-        original_contracts = self.contracts.copy()
-        original_accounts = self.accounts.copy()
-
         try:
-            if transaction_data.get("type") == "deploy":
-                # 模拟部署
-                contract_code = transaction_data.get("code", "")
-                contract = SmartContract(contract_code)
-                address = self.deploy_contract(
-                    contract,
-                    transaction_data.get("constructor_args"),
-                    transaction_data.get("from"),
-                    transaction_data.get("gas_limit", 3000000)
-                )
-                return {
-                    "success": True,
-                    "contract_address": address,
-                    "gas_used": Gas.calculate_deployment_gas(len(contract_code))
-                }
-
-            elif transaction_data.get("type") == "call":
-                # 模拟函数调用
-                result = self.call_contract(
-                    transaction_data.get("to"),
-                    transaction_data.get("function"),
-                    transaction_data.get("args"),
-                    transaction_data.get("from"),
-                    transaction_data.get("value", 0),
-                    transaction_data.get("gas_limit", 100000)
-                )
-                return {
-                    "success": True,
-                    "result": result,
-                    "gas_used": Gas.calculate_function_call_gas(
-                        transaction_data.get("function", ""),
-                        len(transaction_data.get("args", []))
-                    )
-                }
-
-            else:
-                return {"success": False, "error": "未知交易类型"}
-
+            with self._lock, self._checkpoint():
+                return self._execute_simulated(transaction_data)
         except Exception as e:
-            # 恢复状态
-            self.contracts = original_contracts
-            self.accounts = original_accounts
+            # 检查点已回滚状态
             return {"success": False, "error": str(e)}
 
+    def _execute_simulated(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+        """执行模拟交易的具体操作"""
+        if transaction_data.get("type") == "deploy":
+            # 模拟部署
+            contract_code = transaction_data.get("code", "")
+            contract = SmartContract(contract_code)
+            address = self.deploy_contract(
+                contract,
+                transaction_data.get("constructor_args"),
+                transaction_data.get("from"),
+                transaction_data.get("gas_limit", 3000000)
+            )
+            return {
+                "success": True,
+                "contract_address": address,
+                # 复用部署时已计算的Gas，无需重新计算
+                "gas_used": self.last_gas_used
+            }
+
+        elif transaction_data.get("type") == "call":
+            # 模拟函数调用
+            result = self.call_contract(
+                transaction_data.get("to"),
+                transaction_data.get("function"),
+                transaction_data.get("args"),
+                transaction_data.get("from"),
+                transaction_data.get("value", 0),
+                transaction_data.get("gas_limit", 100000)
+            )
+            return {
+                "success": True,
+                "result": result,
+                # 与部署相同，报告调用实际消耗的Gas（含存储操作费用）
+                "gas_used": self.last_gas_used
+            }
+
+        else:
+            return {"success": False, "error": "未知交易类型"}
+
     def __str__(self) -> str:
         return f"EthereumVM(contracts={len(self.contracts)}, block={self.block_number})"
@@ -4,15 +4,72 @@
 管理不同类型的抵押品，包括ETH、BTC等加密货币。
 """
 
+import logging
+import sys
 import time
-from typing import Dict, List, Optional, Set
-from decimal import Decimal, getcontext
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from decimal import ROUND_DOWN, Decimal, getcontext
 from dataclasses import dataclass, field
 from enum import Enum
 
 # 设置精度
 getcontext().prec = 50
 
+# 高频的存取/锁定成功信息走调试日志，默认不输出，也不做字符串格式化
+_log = logging.getLogger(__name__)
+
+# dataclass(slots=True) 需要 Python 3.10+，旧版本退化为普通 dataclass
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# 余额键的低位存放抵押品类型编号：key = (user_id << _COLLATERAL_ID_BITS) | collateral_id
+_COLLATERAL_ID_BITS = 16
+
+# 事件类型，事件日志中以其下标作为操作码
+_EVENT_TYPES = (
+    'collateral_type_added',
+    'collateral_deposit',
+    'collateral_withdrawal',
+    'collateral_locked',
+    'collateral_unlocked',
+    'collateral_type_updated',
+)
+(_EV_TYPE_ADDED, _EV_DEPOSIT, _EV_WITHDRAWAL,
+ _EV_LOCKED, _EV_UNLOCKED, _EV_TYPE_UPDATED) = range(len(_EVENT_TYPES))
+
+
+def _to_decimal(value: Union[int, Decimal, float, str]) -> Decimal:
+    """转换为Decimal；已是Decimal时直接返回，浮点数经字符串转换以避免二进制误差"""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value))
+
+
+def _to_units(amount: Union[int, Decimal, float, str], scale: int) -> int:
+    """
+    将外部传入的数量换算为最小单位整数
+
+    Args:
+        amount: 以代币为单位的数量
+        scale: 最小单位换算系数（10 ** decimals）
+
+    Returns:
+        最小单位整数
+
+    Raises:
+        ValueError: 数量的精度超出最小单位，无法精确记账
+    """
+    if isinstance(amount, int):
+        return amount * scale
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    scaled = amount * scale
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"数量 {amount} 超出抵押品精度（最小单位 {Decimal(1) / scale}）")
+    return int(scaled)
+
 
 class CollateralStatus(Enum):
     """抵押品状态"""
@@ -22,7 +79,7 @@ class CollateralStatus(Enum):
     LIQUIDATED = "liquidated"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class CollateralType:
     """抵押品类型定义"""
     symbol: str
@@ -36,6 +93,11 @@ class CollateralType:
     price_feed: str               # 价格数据源
     is_active: bool = True
 
+    @property
+    def scale(self) -> int:
+        """最小单位换算系数"""
+        return 10 ** self.decimals
+
     def __post_init__(self):
         """初始化后处理"""
         # 确保所有数值都是Decimal类型
@@ -46,24 +108,54 @@ class CollateralType:
         self.debt_ceiling = Decimal(str(self.debt_ceiling))
 
 
-@dataclass
+def _keep(value: Any) -> Any:
+    """原样保留字段值"""
+    return value
+
+
+# 可通过 update_collateral_type 更新的字段 -> 取值转换函数（未列出的参数被忽略）
+# symbol 是各索引的键，decimals 决定余额的最小单位，二者创建后不可修改
+_FIELD_CASTS: Dict[str, Callable[[Any], Any]] = {
+    'name': _keep,
+    'min_collateral_ratio': _to_decimal,
+    'liquidation_ratio': _to_decimal,
+    'liquidation_penalty': _to_decimal,
+    'stability_fee': _to_decimal,
+    'debt_ceiling': _to_decimal,
+    'price_feed': _keep,
+    'is_active': _keep,
+}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class CollateralBalance:
-    """抵押品余额"""
+    """抵押品余额（内部以最小单位整数记账，对外以Decimal呈现）"""
     user: str
     collateral_type: str
-    amount: Decimal
-    locked_amount: Decimal = Decimal('0')
+    scale: int                    # 最小单位换算系数（10 ** decimals）
+    units: int = 0                # 总余额（最小单位）
+    locked_units: int = 0         # 锁定余额（最小单位）
     last_updated: float = field(default_factory=time.time)
 
-    def __post_init__(self):
-        """初始化后处理"""
-        self.amount = Decimal(str(self.amount))
-        self.locked_amount = Decimal(str(self.locked_amount))
+    @property
+    def available_units(self) -> int:
+        """可用余额（最小单位）"""
+        return self.units - self.locked_units
+
+    @property
+    def amount(self) -> Decimal:
+        """总余额"""
+        return Decimal(self.units) / self.scale
+
+    @property
+    def locked_amount(self) -> Decimal:
+        """锁定余额"""
+        return Decimal(self.locked_units) / self.scale
 
     @property
     def available_amount(self) -> Decimal:
         """可用余额"""
-        return self.amount - self.locked_amount
+        return Decimal(self.units - self.locked_units) / self.scale
 
 
 class CollateralManager:
@@ -72,19 +164,35 @@ class CollateralManager:
     def __init__(self):
         # 抵押品类型定义
         self.collateral_types: Dict[str, CollateralType] = {}
+        # 活跃抵押品类型数量，随添加/更新增量维护
+        self._active_count = 0
+
+        # 用户/抵押品类型 -> 顺序分配的整数编号
+        self._user_ids: Dict[str, int] = {}
+        self._collateral_ids: Dict[str, int] = {}
+        # 编号 -> 名称，用于从事件日志还原事件
+        self._user_names: List[str] = []
+        self._collateral_symbols: List[str] = []
 
-        # 抵押品余额 user -> collateral_type -> balance
-        self.balances: Dict[str, Dict[str, CollateralBalance]] = {}
+        # 抵押品余额：扁平字典，以 (用户编号, 抵押品编号) 组合成的整数为键
+        self._balances: Dict[int, CollateralBalance] = {}
+        # 用户编号 -> 该用户的余额键（按创建顺序）
+        self._balance_keys_by_user: Dict[int, List[int]] = {}
 
-        # 抵押品总供应量
-        self.total_supply: Dict[str, Decimal] = {}
+        # 抵押品总供应量（最小单位）
+        self._total_supply_units: Dict[str, int] = {}
 
         # 系统总债务限制
         self.system_debt_ceiling = Decimal('10000000')  # 1000万
         self.current_total_debt = Decimal('0')
 
-        # 事件日志
-        self.events: List[Dict] = []
+        # 事件日志：按列存储，追加时不创建字典，读取时按需组装
+        self._event_ops = bytearray()             # 操作码（_EVENT_TYPES 下标）
+        self._event_users = array('i')            # 用户编号，类型管理事件为 -1
+        self._event_collaterals = array('i')      # 抵押品编号
+        self._event_units: List[int] = []         # 数量（最小单位），读取时换算为Decimal
+        self._event_timestamps = array('d')
+        self._event_extras: Dict[int, Dict] = {}  # 行号 -> 类型管理事件的附加字段
 
         # 初始化默认抵押品类型
         self._init_default_collaterals()
@@ -140,20 +248,23 @@ class CollateralManager:
     def add_collateral_type(self, collateral: CollateralType) -> bool:
         """添加抵押品类型"""
         try:
+            # 驻留符号字符串，后续以同一对象作为各字典的键
+            collateral.symbol = sys.intern(collateral.symbol)
             if collateral.symbol in self.collateral_types:
                 raise ValueError(f"抵押品类型 {collateral.symbol} 已存在")
+            if len(self._collateral_ids) >= 1 << _COLLATERAL_ID_BITS:
+                raise ValueError("抵押品类型数量已达上限")
 
+            collateral_id = self._collateral_ids[collateral.symbol] = len(self._collateral_ids)
+            self._collateral_symbols.append(collateral.symbol)
             self.collateral_types[collateral.symbol] = collateral
-            self.total_supply[collateral.symbol] = Decimal('0')
+            self._total_supply_units[collateral.symbol] = 0
+            if collateral.is_active:
+                self._active_count += 1
 
             # 记录事件
-            event = {
-                'type': 'collateral_type_added',
-                'symbol': collateral.symbol,
-                'name': collateral.name,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
+            self._record_event(_EV_TYPE_ADDED, -1, collateral_id, 0,
+                               {'name': collateral.name})
 
             print(f"✅ 添加抵押品类型: {collateral.name} ({collateral.symbol})")
             return True
@@ -162,176 +273,273 @@ class CollateralManager:
             print(f"❌ 添加抵押品类型失败: {e}")
             return False
 
+    def _deposit(self, user: str, collateral_type: str, amount: Decimal):
+        """存入抵押品（不打印，失败时抛出 ValueError）"""
+        collateral = self.collateral_types.get(collateral_type)
+        if collateral is None:
+            raise ValueError(f"不支持的抵押品类型: {collateral_type}")
+
+        units = _to_units(amount, collateral.scale)
+        if units <= 0:
+            raise ValueError("存入数量必须大于0")
+
+        if not collateral.is_active:
+            raise ValueError(f"抵押品类型 {collateral_type} 已停用")
+
+        # 初始化用户余额
+        user_id = self._user_ids.get(user)
+        if user_id is None:
+            user_id = self._user_ids[user] = len(self._user_ids)
+            self._user_names.append(user)
+
+        collateral_id = self._collateral_ids[collateral_type]
+        key = (user_id << _COLLATERAL_ID_BITS) | collateral_id
+        balance = self._balances.get(key)
+        if balance is None:
+            balance = self._balances[key] = CollateralBalance(
+                user=user,
+                collateral_type=collateral_type,
+                scale=collateral.scale
+            )
+            self._balance_keys_by_user.setdefault(user_id, []).append(key)
+
+        # 更新余额
+        balance.units += units
+        balance.last_updated = time.time()
+
+        # 更新总供应量
+        self._total_supply_units[collateral_type] += units
+
+        # 记录事件
+        self._record_event(_EV_DEPOSIT, user_id, collateral_id, units)
+
     def deposit_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
         """存入抵押品"""
         try:
-            amount = Decimal(str(amount))
-            if amount <= 0:
-                raise ValueError("存入数量必须大于0")
-
-            if collateral_type not in self.collateral_types:
-                raise ValueError(f"不支持的抵押品类型: {collateral_type}")
-
-            if not self.collateral_types[collateral_type].is_active:
-                raise ValueError(f"抵押品类型 {collateral_type} 已停用")
-
-            # 初始化用户余额
-            if user not in self.balances:
-                self.balances[user] = {}
-
-            if collateral_type not in self.balances[user]:
-                self.balances[user][collateral_type] = CollateralBalance(
-                    user=user,
-                    collateral_type=collateral_type,
-                    amount=Decimal('0')
-                )
-
-            # 更新余额
-            self.balances[user][collateral_type].amount += amount
-            self.balances[user][collateral_type].last_updated = time.time()
-
-            # 更新总供应量
-            self.total_supply[collateral_type] += amount
-
-            # 记录事件
-            event = {
-                'type': 'collateral_deposit',
-                'user': user,
-                'collateral_type': collateral_type,
-                'amount': amount,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
-
-            print(f"✅ {user} 存入 {amount} {collateral_type}")
+            self._deposit(user, collateral_type, amount)
+            _log.debug("✅ %s 存入 %s %s", user, amount, collateral_type)
             return True
 
         except Exception as e:
             print(f"❌ 存入抵押品失败: {e}")
             return False
 
-    def withdraw_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
-        """提取抵押品"""
-        try:
-            amount = Decimal(str(amount))
-            if amount <= 0:
-                raise ValueError("提取数量必须大于0")
+    def _withdraw(self, user: str, collateral_type: str, amount: Decimal):
+        """提取抵押品（不打印，失败时抛出 ValueError）"""
+        balance = self.get_collateral_balance(user, collateral_type)
+        if balance is None:
+            raise ValueError("抵押品余额不足")
 
-            if user not in self.balances or collateral_type not in self.balances[user]:
-                raise ValueError("抵押品余额不足")
+        units = _to_units(amount, balance.scale)
+        if units <= 0:
+            raise ValueError("提取数量必须大于0")
 
-            balance = self.balances[user][collateral_type]
-            if balance.available_amount < amount:
-                raise ValueError(f"可用余额不足，可用: {balance.available_amount}")
+        if balance.available_units < units:
+            raise ValueError(f"可用余额不足，可用: {balance.available_amount}")
 
-            # 更新余额
-            balance.amount -= amount
-            balance.last_updated = time.time()
+        # 更新余额
+        balance.units -= units
+        balance.last_updated = time.time()
 
-            # 更新总供应量
-            self.total_supply[collateral_type] -= amount
+        # 更新总供应量
+        self._total_supply_units[collateral_type] -= units
 
-            # 记录事件
-            event = {
-                'type': 'collateral_withdrawal',
-                'user': user,
-                'collateral_type': collateral_type,
-                'amount': amount,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
+        # 记录事件
+        self._record_event(_EV_WITHDRAWAL, self._user_ids[user], self._collateral_ids[collateral_type],
+                           units)
 
-            print(f"✅ {user} 提取 {amount} {collateral_type}")
+    def withdraw_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
+        """提取抵押品"""
+        try:
+            self._withdraw(user, collateral_type, amount)
+            _log.debug("✅ %s 提取 %s %s", user, amount, collateral_type)
             return True
 
         except Exception as e:
             print(f"❌ 提取抵押品失败: {e}")
             return False
 
-    def lock_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
-        """锁定抵押品（用于借贷）"""
-        try:
-            amount = Decimal(str(amount))
-            if amount <= 0:
-                raise ValueError("锁定数量必须大于0")
+    def _lock(self, user: str, collateral_type: str, amount: Decimal):
+        """锁定抵押品（不打印，失败时抛出 ValueError）"""
+        balance = self.get_collateral_balance(user, collateral_type)
+        if balance is None:
+            raise ValueError("抵押品余额不足")
 
-            if user not in self.balances or collateral_type not in self.balances[user]:
-                raise ValueError("抵押品余额不足")
+        units = _to_units(amount, balance.scale)
+        if units <= 0:
+            raise ValueError("锁定数量必须大于0")
 
-            balance = self.balances[user][collateral_type]
-            if balance.available_amount < amount:
-                raise ValueError(f"可用余额不足，可用: {balance.available_amount}")
+        if balance.available_units < units:
+            raise ValueError(f"可用余额不足，可用: {balance.available_amount}")
 
-            # 锁定抵押品
-            balance.locked_amount += amount
-            balance.last_updated = time.time()
+        # 锁定抵押品
+        balance.locked_units += units
+        balance.last_updated = time.time()
 
-            # 记录事件
-            event = {
-                'type': 'collateral_locked',
-                'user': user,
-                'collateral_type': collateral_type,
-                'amount': amount,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
+        # 记录事件
+        self._record_event(_EV_LOCKED, self._user_ids[user], self._collateral_ids[collateral_type],
+                           units)
 
-            print(f"✅ 锁定 {user} 的 {amount} {collateral_type}")
+    def lock_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
+        """锁定抵押品（用于借贷）"""
+        try:
+            self._lock(user, collateral_type, amount)
+            _log.debug("✅ 锁定 %s 的 %s %s", user, amount, collateral_type)
             return True
 
         except Exception as e:
             print(f"❌ 锁定抵押品失败: {e}")
             return False
 
-    def unlock_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
-        """解锁抵押品"""
-        try:
-            amount = Decimal(str(amount))
-            if amount <= 0:
-                raise ValueError("解锁数量必须大于0")
+    def _unlock(self, user: str, collateral_type: str, amount: Decimal):
+        """解锁抵押品（不打印，失败时抛出 ValueError）"""
+        balance = self.get_collateral_balance(user, collateral_type)
+        if balance is None:
+            raise ValueError("抵押品余额不足")
 
-            if user not in self.balances or collateral_type not in self.balances[user]:
-                raise ValueError("抵押品余额不足")
+        units = _to_units(amount, balance.scale)
+        if units <= 0:
+            raise ValueError("解锁数量必须大于0")
 
-            balance = self.balances[user][collateral_type]
-            if balance.locked_amount < amount:
-                raise ValueError(f"锁定余额不足，锁定: {balance.locked_amount}")
+        if balance.locked_units < units:
+            raise ValueError(f"锁定余额不足，锁定: {balance.locked_amount}")
 
-            # 解锁抵押品
-            balance.locked_amount -= amount
-            balance.last_updated = time.time()
+        # 解锁抵押品
+        balance.locked_units -= units
+        balance.last_updated = time.time()
 
-            # 记录事件
-            event = {
-                'type': 'collateral_unlocked',
-                'user': user,
-                'collateral_type': collateral_type,
-                'amount': amount,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
+        # 记录事件
+        self._record_event(_EV_UNLOCKED, self._user_ids[user], self._collateral_ids[collateral_type],
+                           units)
 
-            print(f"✅ 解锁 {user} 的 {amount} {collateral_type}")
+    def unlock_collateral(self, user: str, collateral_type: str, amount: Decimal) -> bool:
+        """解锁抵押品"""
+        try:
+            self._unlock(user, collateral_type, amount)
+            _log.debug("✅ 解锁 %s 的 %s %s", user, amount, collateral_type)
             return True
 
         except Exception as e:
             print(f"❌ 解锁抵押品失败: {e}")
             return False
 
+    def _record_event(self, op: int, user_id: int, collateral_id: int, units: int,
+                      extra: Optional[Dict] = None):
+        """向事件日志各列追加一行"""
+        if extra is not None:
+            self._event_extras[len(self._event_ops)] = extra
+        self._event_ops.append(op)
+        self._event_users.append(user_id)
+        self._event_collaterals.append(collateral_id)
+        self._event_units.append(units)
+        self._event_timestamps.append(time.time())
+
+    def _materialize_event(self, index: int) -> Dict:
+        """按行号组装出与原事件格式一致的字典"""
+        op = self._event_ops[index]
+        symbol = self._collateral_symbols[self._event_collaterals[index]]
+        if op == _EV_TYPE_ADDED or op == _EV_TYPE_UPDATED:
+            event = {'type': _EVENT_TYPES[op], 'symbol': symbol}
+            event.update(self._event_extras[index])
+        else:
+            event = {
+                'type': _EVENT_TYPES[op],
+                'user': self._user_names[self._event_users[index]],
+                'collateral_type': symbol,
+                'amount': Decimal(self._event_units[index]) / self.collateral_types[symbol].scale,
+            }
+        event['timestamp'] = self._event_timestamps[index]
+        return event
+
+    def get_events(self, event_type: Optional[str] = None) -> List[Dict]:
+        """
+        获取事件
+
+        Args:
+            event_type: 事件类型过滤器，如 'collateral_deposit'
+
+        Returns:
+            事件字典列表（按需组装）
+        """
+        ops = self._event_ops
+        if event_type is None:
+            indices: Iterable[int] = range(len(ops))
+        elif event_type in _EVENT_TYPES:
+            op = _EVENT_TYPES.index(event_type)
+            indices = [i for i, value in enumerate(ops) if value == op]
+        else:
+            return []
+        return [self._materialize_event(i) for i in indices]
+
+    @property
+    def events(self) -> List[Dict]:
+        """全部事件（按需组装的列表快照）"""
+        return self.get_events()
+
+    def batch_apply(self, operations: Iterable[Tuple[str, str, str, Any]]) -> List[bool]:
+        """
+        批量执行抵押品操作，用于回测、清算模拟等大批量重放场景
+
+        每个操作与对应的单条方法语义相同，但不逐条打印；
+        某个操作失败只记为False，不影响后续操作
+
+        Args:
+            operations: (操作, 用户, 抵押品类型, 数量) 序列，
+                操作为 deposit / withdraw / lock / unlock
+
+        Returns:
+            每个操作是否成功
+        """
+        handlers = {
+            "deposit": self._deposit,
+            "withdraw": self._withdraw,
+            "lock": self._lock,
+            "unlock": self._unlock,
+        }
+        results = []
+        append = results.append
+        for op, user, collateral_type, amount in operations:
+            handler = handlers.get(op)
+            if handler is None:
+                append(False)
+                continue
+            try:
+                handler(user, collateral_type, amount)
+            except (ValueError, ArithmeticError):
+                append(False)
+            else:
+                append(True)
+        return results
+
     def get_collateral_balance(
             self,
             user: str,
             collateral_type: str) -> Optional[CollateralBalance]:
         """获取抵押品余额"""
-        if user not in self.balances or collateral_type not in self.balances[user]:
+        user_id = self._user_ids.get(user)
+        collateral_id = self._collateral_ids.get(collateral_type)
+        if user_id is None or collateral_id is None:
             return None
-        return self.balances[user][collateral_type]
+        return self._balances.get((user_id << _COLLATERAL_ID_BITS) | collateral_id)
 
     def get_user_collaterals(self, user: str) -> Dict[str, CollateralBalance]:
         """获取用户所有抵押品"""
-        if user not in self.balances:
+        user_id = self._user_ids.get(user)
+        if user_id is None:
             return {}
-        return self.balances[user].copy()
+        balances = self._balances
+        return {
+            balance.collateral_type: balance
+            for balance in (balances[key] for key in self._balance_keys_by_user[user_id])
+        }
+
+    @property
+    def balances(self) -> Dict[str, Dict[str, CollateralBalance]]:
+        """按 用户 -> 抵押品类型 组织的余额视图（新建的字典快照）"""
+        result: Dict[str, Dict[str, CollateralBalance]] = {}
+        for balance in self._balances.values():
+            result.setdefault(balance.user, {})[balance.collateral_type] = balance
+        return result
 
     def get_collateral_type(self, symbol: str) -> Optional[CollateralType]:
         """获取抵押品类型信息"""
@@ -341,9 +549,25 @@ class CollateralManager:
         """获取所有抵押品类型"""
         return self.collateral_types.copy()
 
+    @property
+    def total_supply(self) -> Dict[str, Decimal]:
+        """各抵押品总供应量（由最小单位换算的快照）"""
+        return {symbol: self.get_total_supply(symbol) for symbol in self._total_supply_units}
+
     def get_total_supply(self, collateral_type: str) -> Decimal:
         """获取抵押品总供应量"""
-        return self.total_supply.get(collateral_type, Decimal('0'))
+        units = self._total_supply_units.get(collateral_type)
+        if units is None:
+            return Decimal('0')
+        return Decimal(units) / self.collateral_types[collateral_type].scale
+
+    def quantize_amount(self, collateral_type: str, amount: Decimal) -> Decimal:
+        """将数量向下取整到抵押品的最小单位（用于按比例计算出的数量）"""
+        collateral = self.collateral_types.get(collateral_type)
+        if collateral is None:
+            raise ValueError(f"不支持的抵押品类型: {collateral_type}")
+        return _to_decimal(amount).quantize(Decimal(1).scaleb(-collateral.decimals),
+                                            rounding=ROUND_DOWN)
 
     def calculate_collateral_value(
             self,
@@ -351,7 +575,29 @@ class CollateralManager:
             amount: Decimal,
             price: Decimal) -> Decimal:
         """计算抵押品价值"""
-        return Decimal(str(amount)) * Decimal(str(price))
+        return _to_decimal(amount) * _to_decimal(price)
+
+    def calculate_collateral_values(
+            self,
+            collateral_type: str,
+            amounts: Iterable[Decimal],
+            price: Decimal) -> List[Decimal]:
+        """
+        批量计算同一种抵押品的价值（如清算检查时遍历全部头寸）
+
+        同一抵押品共用一个价格，价格只转换一次；结果与逐个调用
+        calculate_collateral_value 完全一致
+
+        Args:
+            collateral_type: 抵押品类型
+            amounts: 各头寸的抵押品数量
+            price: 抵押品价格
+
+        Returns:
+            各头寸的抵押品价值
+        """
+        price = _to_decimal(price)
+        return [_to_decimal(amount) * price for amount in amounts]
 
     def check_debt_ceiling(self, collateral_type: str, additional_debt: Decimal) -> bool:
         """检查债务上限"""
@@ -376,24 +622,25 @@ class CollateralManager:
                 raise ValueError(f"抵押品类型 {symbol} 不存在")
 
             collateral = self.collateral_types[symbol]
+            was_active = collateral.is_active
+
+            # 余额按创建时的精度以最小单位记账，修改精度会使余额与总供应量失真
+            if 'decimals' in kwargs and kwargs['decimals'] != collateral.decimals:
+                raise ValueError(f"抵押品类型 {symbol} 的精度不可修改")
 
             # 更新参数
-            for key, value in kwargs.items():
-                if hasattr(collateral, key):
-                    if key in ['min_collateral_ratio', 'liquidation_ratio',
-                               'liquidation_penalty', 'stability_fee', 'debt_ceiling']:
-                        setattr(collateral, key, Decimal(str(value)))
-                    else:
-                        setattr(collateral, key, value)
+            try:
+                for key, value in kwargs.items():
+                    cast = _FIELD_CASTS.get(key)
+                    if cast is not None:
+                        setattr(collateral, key, cast(value))
+            finally:
+                # 即使中途出错，也按实际的 is_active 变化修正活跃计数
+                self._active_count += bool(collateral.is_active) - bool(was_active)
 
             # 记录事件
-            event = {
-                'type': 'collateral_type_updated',
-                'symbol': symbol,
-                'updates': kwargs,
-                'timestamp': time.time()
-            }
-            self.events.append(event)
+            self._record_event(_EV_TYPE_UPDATED, -1, self._collateral_ids[symbol], 0,
+                               {'updates': kwargs})
 
             print(f"✅ 更新抵押品类型 {symbol} 参数")
             return True
@@ -408,8 +655,8 @@ class CollateralManager:
             'total_collateral_types': len(self.collateral_types),
             'system_debt_ceiling': self.system_debt_ceiling,
             'current_total_debt': self.current_total_debt,
-            'collateral_supplies': self.total_supply.copy(),
-            'active_collaterals': len([c for c in self.collateral_types.values() if c.is_active])
+            'collateral_supplies': self.total_supply,
+            'active_collaterals': self._active_count
         }
         return stats
 
@@ -428,5 +675,5 @@ class CollateralManager:
             print(f"  状态: {'活跃' if collateral.is_active else '停用'}")
             print(f"  最小抵押率: {collateral.min_collateral_ratio}%")
             print(f"  清算阈值: {collateral.liquidation_ratio}%")
-            print(f"  总供应量: {self.total_supply[symbol]}")
+            print(f"  总供应量: {self.get_total_supply(symbol)}")
             print(f"  债务上限: {collateral.debt_ceiling}")
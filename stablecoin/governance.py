@@ -397,7 +397,7 @@ class GovernanceSystem:
         """生成提案ID"""
         import hashlib
         data = f"proposal_{time.time()}_{len(self.proposals)}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
 
     def get_proposal(self, proposal_id: str) -> Optional[Proposal]:
         """获取提案信息"""
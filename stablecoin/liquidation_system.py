@@ -304,7 +304,11 @@ class LiquidationSystem:
                 return False
 
             # 3. 给清算器抵押品奖励
-            collateral_reward = liquidation_event.collateral_amount - liquidation_event.penalty_amount
+            # 按比例算出的奖励精度高于抵押品最小单位，向下取整后再入账
+            collateral_reward = self.collateral_manager.quantize_amount(
+                liquidation_event.collateral_type,
+                liquidation_event.collateral_amount - liquidation_event.penalty_amount
+            )
             if not self.collateral_manager.deposit_collateral(
                 liquidation_event.liquidator,
                 liquidation_event.collateral_type,
@@ -338,7 +342,7 @@ class LiquidationSystem:
         """生成清算ID"""
         import hashlib
         data = f"liquidation_{time.time()}_{len(self.liquidation_events)}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
 
     def get_liquidation_event(self, liquidation_id: str) -> Optional[LiquidationEvent]:
         """获取清算事件"""
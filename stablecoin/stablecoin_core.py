@@ -35,7 +35,7 @@ class StableCoinPosition:
     def _generate_position_id(self) -> str:
         """生成唯一的头寸ID"""
         data = f"{self.owner}{self.collateral_type}{self.created_at}{time.time()}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        return hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
 
     def update_ratios(self, collateral_price: Decimal):
         """更新抵押率和清算价格"""
@@ -204,6 +204,9 @@ class StableCoinFactory:
 
                 max_withdraw = position.collateral_amount - min_collateral_amount
                 max_withdraw = max(max_withdraw, Decimal('0'))
+                # 向下取整到抵押品最小单位，保证剩余抵押率不低于要求
+                max_withdraw = self.collateral_manager.quantize_amount(
+                    position.collateral_type, max_withdraw)
 
             # 确定提取数量
             if withdraw_amount is None:
@@ -11,6 +11,7 @@ Bitcoin核心功能使用示例
 
 import bitcoin
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 
 def print_section(title: str):
@@ -302,6 +303,85 @@ def demo_basic_features():
     print_section("11. 系统统计信息")
     bitcoin.BlockchainDisplay.print_chain_status(blockchain)
 
+    # 13. 输入地址验证
+    print_section("12. 输入地址验证")
+
+    # 新UTXO的HASH160在首次被输入引用时才从地址解码
+    alice_utxo = blockchain.get_utxos_by_address(wallets['Alice'].address)[0]
+    expected_hash160 = bitcoin.AddressValidator.hash160_from_public_key(
+        wallets['Alice'].public_key_hex)
+    print(f"Alice的UTXO公钥哈希: {alice_utxo.hash160.hex()}")
+    assert alice_utxo.hash160 == expected_hash160
+
+    invalid_utxo = bitcoin.UTXO("00" * 32, 0, 1.0, "not-an-address")
+    assert invalid_utxo.hash160 is None
+    print("无效地址的UTXO不缓存公钥哈希")
+
+    # 14. 签名验证
+    print_section("13. 签名验证")
+
+    signed_txs = [
+        bitcoin.Transaction.from_dict(tx_data)
+        for block in blockchain.chain[1:] for tx_data in block.transactions
+        if tx_data['inputs']
+    ]
+    assert bitcoin.verify_block_signatures(signed_txs)
+    print(f"串行验证 {len(signed_txs)} 笔交易的签名: 通过")
+
+    # 签名较多时使用调用方提供的进程池并行验证，进程池可在多次验证间复用
+    repeat = bitcoin.transaction.PARALLEL_VERIFY_THRESHOLD // len(signed_txs) + 1
+    batch = signed_txs * repeat
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert bitcoin.verify_block_signatures(batch, executor=executor)
+        assert bitcoin.verify_block_signatures(batch, executor=executor)
+    print(f"并行验证 {len(batch)} 笔交易的签名: 通过")
+
+    # 篡改签名后验证失败
+    tampered = bitcoin.Transaction.from_dict(signed_txs[0].to_dict())
+    tampered.outputs[0].amount += 1
+    assert not bitcoin.verify_block_signatures([tampered])
+    print("篡改后的交易签名验证: 失败")
+
+    # 15. UTXO选择与地址派生
+    print_section("14. UTXO选择与地址派生")
+
+    # 优先选择大额UTXO，余额不足时返回空列表
+    alice_address = wallets['Alice'].address
+    alice_utxos = blockchain.get_utxos_by_address(alice_address)
+    largest = max(utxo.amount for utxo in alice_utxos)
+    selected = blockchain.utxo_set.select_utxos(alice_address, largest)
+    print(f"选择 {largest} BTC: {[utxo.amount for utxo in selected]}")
+    assert [utxo.amount for utxo in selected] == [largest]
+    assert blockchain.utxo_set.select_utxos(
+        alice_address, blockchain.get_balance(alice_address) + 1) == []
+
+    # 无序求和恰好达到目标、降序累加却差一点时，不返回不足额的UTXO
+    float_set = bitcoin.UTXOSet()
+    for index, amount in enumerate([1.0, 1.0, 1e16]):
+        float_set.add_utxo(bitcoin.UTXO("ff" * 32, index, amount, alice_address))
+    assert float_set.select_utxos(alice_address, 1e16 + 2.0) == []
+
+    # 反序列化时沿用已记录的交易ID，不重新计算哈希
+    restored_tx = bitcoin.Transaction.from_dict(signed_txs[0].to_dict())
+    assert restored_tx.transaction_id == signed_txs[0].transaction_id
+    # 新建交易的ID在首次访问时计算并缓存
+    fresh_tx = bitcoin.Transaction(outputs=[bitcoin.TransactionOutput(1.0, alice_address)])
+    assert fresh_tx.transaction_id is fresh_tx.transaction_id
+    print(f"交易ID: {fresh_tx.transaction_id[:16]}...")
+
+    # 批量派生地址：顺序与输入一致，重复公钥只计算一次，无效公钥对应空字符串
+    public_keys = [wallets[name].public_key_hex for name in ('Alice', 'Bob', 'Alice')]
+    derived = bitcoin.AddressValidator.derive_addresses(public_keys + ["zz"])
+    print(f"批量派生地址: {len(derived)} 个")
+    assert derived == [wallets['Alice'].address, wallets['Bob'].address,
+                       wallets['Alice'].address, ""]
+
+    # UTXO ID与字符串互相转换（用于JSON序列化）
+    utxo_id = alice_utxo.get_utxo_id()
+    utxo_id_str = bitcoin.UTXOSet.utxo_id_to_str(utxo_id)
+    print(f"UTXO ID字符串: {utxo_id_str[:16]}...:{utxo_id[1]}")
+    assert bitcoin.UTXOSet.utxo_id_from_str(utxo_id_str) == utxo_id
+
 
 def demo_merkle_tree():
     """演示Merkle树功能"""
@@ -13,12 +13,17 @@
 - 区块链操作
 """
 
+import io
+import json
+
 import ethereum
 from ethereum import (
     SmartContract, EthereumVM, ContractManager,
     SolidityCompiler, AccountManager, EthereumBlockchain,
     EthereumTransaction
 )
+from ethereum.contract_manager import ContractInfo
+from ethereum.utils import hash_json
 
 
 def demo_basic_smart_contract():
@@ -65,7 +70,7 @@ def demo_basic_smart_contract():
     print(f"  ABI函数数量: {len(compile_result.abi)}")
 
     # 创建合约实例
-    contract = SmartContract(compile_result.bytecode, compile_result.abi)
+    contract = SmartContract(compile_result.bytecode, compile_result.abi, trace_calls=True)
 
     # 部署合约
     deployer = "0x1234567890123456789012345678901234567890"
@@ -82,12 +87,51 @@ def demo_basic_smart_contract():
     result = vm.call_contract(contract_address, "get_value", ["storedData"])
     print(f"新值: {result}")
 
+    # 非内置函数走默认执行逻辑
+    result = vm.call_contract(contract_address, "get", [])
+    print(f"调用非内置函数: {result}")
+    assert result == "执行函数 get 参数: []"
+
     # 获取合约事件
     events = vm.get_contract_events(contract_address)
     print(f"事件数量: {len(events)}")
     for event in events:
         print(f"  {event.name}: {event.args}")
 
+    # 事件按名称和起始区块过滤
+    for block_number in range(1, 4):
+        contract.emit_event("Deposit", {"amount": block_number}, block_number=block_number,
+                            timestamp=1700000000 + block_number)
+    contract.emit_event("Withdraw", {"amount": 1}, block_number=3, timestamp=1700000003)
+    deposits = contract.get_events("Deposit", from_block=2)
+    print(f"区块2起的Deposit事件: {[e.args['amount'] for e in deposits]}")
+    assert [e.args["amount"] for e in deposits] == [2, 3]
+    assert [e.name for e in contract.get_events(from_block=3)] == ["Deposit", "Withdraw"]
+    assert deposits[-1].timestamp == 1700000003
+    try:
+        contract.events.append(deposits[0])
+    except AttributeError:
+        print("事件快照不可修改")
+    else:
+        raise AssertionError("事件快照应不可修改")
+
+    # 存储快照与合约信息带缓存，但调用方拿到的结果不能影响合约
+    storage = contract.get_storage()
+    try:
+        storage["storedData"] = 999
+    except TypeError:
+        print("存储快照为只读视图")
+    else:
+        raise AssertionError("存储快照应不可修改")
+    assert contract.get_storage() is storage
+    info = contract.get_info()
+    info["balance"] = -1
+    assert contract.get_info()["balance"] == contract.balance
+    assert isinstance(info["functions"], tuple)
+    vm.call_contract(contract_address, "set_value", ["storedData", 7])
+    assert contract.get_storage()["storedData"] == 7
+    assert contract.get_info()["storage_size"] == len(contract.storage)
+
 
 def demo_contract_manager():
     """演示合约管理器功能"""
@@ -160,6 +204,107 @@ def demo_contract_manager():
     for i, result in enumerate(results):
         print(f"  {i+1}. 成功: {result['success']}, 结果: {result.get('result', result.get('error'))}")
 
+    # 附带以太币的批量调用：逐笔扣款，账户余额准确
+    payer = "0x9876543210987654321098765432109876543210"
+    manager.vm.set_account_balance(payer, 1000)
+    calls = [
+        {"address": contract_address, "function": "get_value", "args": ["data"],
+         "caller": payer, "value": 1}
+        for _ in range(200)
+    ]
+    results = manager.batch_call(calls)
+    succeeded = sum(result["success"] for result in results)
+    print(f"附带转账的批量调用: {succeeded}/{len(calls)} 成功，"
+          f"付款方余额: {manager.vm.get_account_balance(payer)}")
+    assert manager.vm.get_account_balance(payer) == 1000 - succeeded
+
+    # 统计信息是普通字典快照，可直接序列化，之后注册的合约不会改变它
+    stats = manager.get_manager_statistics()
+    json.dumps(stats)
+    by_name = stats["registry"]["contracts_by_name"]
+    manager.registry.register(ContractInfo(
+        name="我的存储合约", version="1.0.1", address="0x" + "ab" * 20,
+        deployer=deployer, deployment_time=0))
+    print(f"按名称统计: {by_name}")
+    assert by_name == {"我的存储合约": 1}
+    assert manager.get_manager_statistics()["registry"]["contracts_by_name"] == {"我的存储合约": 2}
+
+    # 以新名称和标签重新注册同一地址，旧名称/标签下不再残留该合约
+    manager.registry.register(ContractInfo(
+        name="重命名合约", version="1.0.2", address="0x" + "ab" * 20,
+        deployer=deployer, deployment_time=0, tags=["renamed"]))
+    assert [c.version for c in manager.find_contracts(name="我的存储合约")] == ["1.0.0"]
+    assert [c.version for c in manager.find_contracts(name="重命名合约")] == ["1.0.2"]
+    assert manager.find_contracts(tag="renamed", name="重命名合约")[0].version == "1.0.2"
+    print(f"重新注册后按名称统计: {manager.registry.get_statistics()['contracts_by_name']}")
+
+
+
+def demo_contract_batch_operations():
+    """演示合约批量部署、组合查询与导出"""
+    print("\n" + "=" * 60)
+    print("合约批量操作演示")
+    print("=" * 60)
+
+    manager = ContractManager()
+    deployer = "0xabcdefabcdefabcdefabcdefabcdefabcdefabcd"
+
+    # 批量部署：合约代码各不相同，地址互不冲突
+    deployments = [
+        {
+            "contract": SmartContract(f"contract Vault{i} {{ uint256 public data; }}"),
+            "deployer": deployer,
+            "contract_name": "Vault",
+            "version": f"1.0.{i}",
+            "tags": ["vault", "defi" if i % 2 == 0 else "nft"]
+        }
+        for i in range(4)
+    ]
+    addresses = manager.batch_deploy(deployments)
+    print(f"批量部署: {len(addresses)} 个合约")
+    assert len(set(addresses)) == 4
+    assert [manager.get_contract_info(a).version for a in addresses] == [
+        "1.0.0", "1.0.1", "1.0.2", "1.0.3"]
+    # 同一批次共用部署时间戳
+    assert len({manager.get_contract_info(a).deployment_time for a in addresses}) == 1
+
+    # 组合查询：名称与多个标签同时满足
+    defi = manager.find_contracts(name="Vault", tags=["vault", "defi"])
+    print(f"Vault + vault + defi: {[c.version for c in defi]}")
+    assert sorted(c.address for c in defi) == sorted([addresses[0], addresses[2]])
+    assert manager.registry.find_by_filters(tags=["nft"], version="1.0.3")[0].address == \
+        addresses[3]
+    assert manager.find_contracts(tag="nft", name="Other") == []
+
+    # iter_all 返回注册表的实时视图
+    all_contracts = manager.registry.iter_all()
+    assert len(all_contracts) == 4
+    assert {c.address for c in all_contracts} == set(addresses)
+
+    # 流式导出到二进制文件对象，格式与 export_contracts 相同，可直接导入
+    buffer = io.BytesIO()
+    count = manager.export_contracts_to(buffer, addresses[:2] + [addresses[0], "0xmissing"])
+    exported = json.loads(buffer.getvalue())
+    print(f"流式导出: {count} 个合约，{len(buffer.getvalue())} 字节")
+    assert count == 2
+    assert list(exported["contracts"]) == addresses[:2]
+    assert exported["contracts"] == manager.export_contracts(addresses[:2])["contracts"]
+
+    restored = ContractManager()
+    restored.import_contracts(exported)
+    assert [c.address for c in restored.find_contracts(tag="defi")] == [addresses[0]]
+    assert restored.get_contract(addresses[1]).contract_code == \
+        manager.get_contract(addresses[1]).contract_code
+
+    # 无论经由虚拟机调用、合约自身的 destroy 函数还是直接设置状态销毁，都会被清理
+    manager.call_contract(addresses[1], "destroy", [], deployer)
+    manager.get_contract(addresses[2]).call_function("destroy", [], deployer)
+    manager.get_contract(addresses[3]).state = ethereum.ContractState.DESTROYED
+    cleaned = manager.cleanup_destroyed_contracts()
+    print(f"清理已销毁合约: {cleaned} 个")
+    assert cleaned == 3
+    assert list(manager.vm.contracts) == [addresses[0]]
+    assert [c.address for c in manager.registry.list_all()] == [addresses[0]]
 
 def demo_account_management():
     """演示账户管理功能"""
@@ -256,6 +401,203 @@ def demo_blockchain_operations():
     print(f"  平均出块时间: {chain_info['average_block_time']:.1f}秒")
 
 
+def demo_transaction_validation():
+    """演示交易验证"""
+    print("\n" + "=" * 60)
+    print("交易验证演示")
+    print("=" * 60)
+
+    blockchain = EthereumBlockchain()
+    sender = "0x1111111111111111111111111111111111111111"
+    blockchain.set_balance(sender, 10 ** 18)
+
+    tx = EthereumTransaction(
+        from_address=sender,
+        to_address="0x2222222222222222222222222222222222222222",
+        value=10 ** 17,
+        gas_limit=21000,
+        gas_price=20000000000
+    )
+    print(f"正常交易验证: {blockchain.validate_transaction(tx)}")
+    assert blockchain.validate_transaction(tx)
+
+    # 篡改16进制哈希（各索引以它为键）后验证应失败
+    tx.transaction_hash = "deadbeef"
+    print(f"篡改哈希后验证: {blockchain.validate_transaction(tx)}")
+    assert not blockchain.validate_transaction(tx)
+
+    # 非法字段值可以构造交易，由验证环节拒绝
+    bad_tx = EthereumTransaction(
+        from_address=sender,
+        to_address="0x2222222222222222222222222222222222222222",
+        value=-1,
+        gas_limit=21000,
+        gas_price=20000000000,
+        timestamp=1700000000.5
+    )
+    print(f"负数金额交易验证: {blockchain.validate_transaction(bad_tx)}")
+    assert not blockchain.validate_transaction(bad_tx)
+
+    # 批量验证交易池，结果与逐笔验证一致
+    good_tx = EthereumTransaction(
+        from_address=sender,
+        to_address="0x2222222222222222222222222222222222222222",
+        value=10 ** 17,
+        gas_limit=21000,
+        gas_price=20000000000,
+        nonce=1
+    )
+    poor_tx = EthereumTransaction(
+        from_address="0x9999999999999999999999999999999999999999",
+        to_address=sender,
+        value=1,
+        gas_limit=21000,
+        gas_price=20000000000
+    )
+    for pending_tx in (good_tx, bad_tx, poor_tx):
+        blockchain.add_transaction(pending_tx)
+    results = blockchain.bulk_validate()
+    print(f"批量验证结果: {results}")
+    assert results == [True, False, False]
+
+    # 哈希原像始终由同一编码器生成，浮点数写法不随其他字段是否超出64位而变化
+    assert hash_json({"gas": 1e16}) == b'{"gas":1e+16}'
+    assert hash_json({"gas": 1e16, "value": 2 ** 70}) == \
+        b'{"gas":1e+16,"value":1180591620717411303424}'
+
+
+def demo_transaction_pool():
+    """演示交易池管理"""
+    print("\n" + "=" * 60)
+    print("交易池演示")
+    print("=" * 60)
+
+    blockchain = EthereumBlockchain()
+    sender = "0x1111111111111111111111111111111111111111"
+    receiver = "0x2222222222222222222222222222222222222222"
+
+    tx1 = EthereumTransaction(sender, receiver, 1, 21000, 20000000000, nonce=0)
+    tx2 = EthereumTransaction(sender, receiver, 2, 21000, 20000000000, nonce=1)
+    blockchain.add_transaction(tx1)
+    blockchain.add_transaction(tx2)
+
+    # pending_transactions 是只读快照，增删通过专用方法
+    pending = blockchain.pending_transactions
+    print(f"待处理交易: {len(pending)}")
+    try:
+        pending.append(tx1)
+    except AttributeError:
+        print("待处理交易快照不可修改")
+    else:
+        raise AssertionError("待处理交易快照应不可修改")
+
+    assert blockchain.remove_pending_transaction(tx1.transaction_hash)
+    assert not blockchain.remove_pending_transaction(tx1.transaction_hash)
+    assert blockchain.pending_transactions == (tx2,)
+    assert blockchain.get_pending_transaction_by_nonce(sender, 0) is None
+    print(f"移除后待处理交易: {blockchain.get_pending_transactions_count()}")
+
+    # 相同发送方和nonce的替换交易：gas价格提高不足10%时拒绝
+    cheaper = EthereumTransaction(sender, receiver, 2, 21000, 10000000000, nonce=1)
+    small_bump = EthereumTransaction(sender, receiver, 2, 21000, 21000000000, nonce=1)
+    bumped = EthereumTransaction(sender, receiver, 2, 21000, 22000000000, nonce=1)
+    print(f"低价替换: {blockchain.add_transaction(cheaper)}")
+    print(f"加价5%替换: {blockchain.add_transaction(small_bump)}")
+    print(f"加价10%替换: {blockchain.add_transaction(bumped)}")
+    assert blockchain.get_pending_transaction_by_nonce(sender, 1) is bumped
+    assert blockchain.pending_transactions == (bumped,)
+
+    # 导出为JSON字节串后导入，待处理交易经同一入池规则恢复
+    exported = blockchain.export_blockchain_bytes()
+    restored = EthereumBlockchain()
+    restored.import_blockchain(json.loads(exported))
+    print(f"导出字节数: {len(exported)}，导入后待处理交易: "
+          f"{restored.get_pending_transactions_count()}")
+    assert [tx.transaction_hash for tx in restored.pending_transactions] == [
+        bumped.transaction_hash]
+    assert restored.get_pending_transaction_by_nonce(sender, 1).transaction_hash == \
+        bumped.transaction_hash
+
+
+
+def demo_chain_queries():
+    """演示区块链查询"""
+    print("\n" + "=" * 60)
+    print("链上查询演示")
+    print("=" * 60)
+
+    blockchain = EthereumBlockchain()
+    miner = "0x" + "99" * 20
+    sender = "0x1111111111111111111111111111111111111111"
+    receiver = "0x2222222222222222222222222222222222222222"
+    cheap = EthereumTransaction(sender, receiver, 1, 21000, 10000000000, nonce=0)
+    pricey = EthereumTransaction(receiver, sender, 2, 21000, 30000000000, nonce=0)
+    blockchain.add_transaction(cheap)
+    blockchain.add_transaction(pricey)
+    # 按gas价格从高到低打包
+    block = blockchain.mine_block(miner, max_transactions=1)
+    print(f"区块 {block.block_number} 打包: {[tx.value for tx in block.transactions]}")
+    assert block.transactions == [pricey]
+    assert blockchain.pending_transactions == (cheap,)
+    assert blockchain.mine_block(miner).transactions == [cheap]
+
+    # 按哈希查找区块和已打包的交易
+    assert blockchain.get_block_by_hash(block.block_hash) is block
+    assert blockchain.get_transaction(pricey.transaction_hash) is pricey
+    assert blockchain.get_transaction(cheap.transaction_hash) is cheap
+    assert blockchain.get_block_by_hash("00" * 32) is None
+
+    # 交易历史按地址索引，发送和接收的交易都会记录
+    history = blockchain.get_transaction_history(sender)
+    print(f"{sender[:10]}... 的交易历史: {len(history)} 笔")
+    assert {tx.transaction_hash for tx in history} == {
+        cheap.transaction_hash, pricey.transaction_hash}
+    assert blockchain.get_transaction_history("0x" + "33" * 20) == []
+
+    # 总难度随出块增量维护，与逐块求和一致
+    print(f"总难度: {blockchain.get_total_difficulty()}")
+    assert blockchain.get_total_difficulty() == sum(
+        blockchain.get_block_by_number(n).difficulty
+        for n in range(blockchain.get_chain_length()))
+
+
+def demo_vm_simulation():
+    """演示交易模拟执行"""
+    print("\n" + "=" * 60)
+    print("模拟执行演示")
+    print("=" * 60)
+
+    vm = EthereumVM()
+    deployer = "0x1234567890123456789012345678901234567890"
+    vm.set_account_balance(deployer, 10)
+    address = vm.deploy_contract(SmartContract("contract Counter { uint256 public n; }"),
+                                 deployer=deployer)
+    print(f"部署Gas: {vm.last_gas_used}")
+    assert vm.last_gas_used > 0
+
+    # 模拟执行报告实际消耗的Gas，调用的Gas包含存储操作费用
+    simulated = vm.simulate_transaction({
+        "type": "deploy", "code": "contract Other { }", "from": deployer})
+    assert simulated["success"]
+    assert simulated["gas_used"] == vm.last_gas_used
+    simulated = vm.simulate_transaction({
+        "type": "call", "to": address, "function": "set_value", "args": ["n", 1],
+        "from": deployer})
+    print(f"模拟调用 set_value 的Gas: {simulated['gas_used']}")
+    assert simulated["gas_used"] == vm.last_gas_used
+    assert simulated["gas_used"] > ethereum.virtual_machine.Gas.calculate_function_call_gas(
+        "set_value", 2)
+
+    # 模拟失败时回滚状态：余额不足的转账调用不会改变账户
+    contracts_before = len(vm.contracts)
+    failed = vm.simulate_transaction({
+        "type": "call", "to": address, "function": "get_value", "args": ["n"],
+        "from": deployer, "value": 100})
+    print(f"余额不足的模拟调用: {failed}")
+    assert not failed["success"]
+    assert vm.get_account_balance(deployer) == 10
+    assert len(vm.contracts) == contracts_before
+
 def demo_gas_calculation():
     """演示Gas计算"""
     print("\n" + "=" * 60)
@@ -368,7 +710,7 @@ def demo_complete_dapp():
 
     compiler = SolidityCompiler()
     compile_result = compiler.compile(token_contract_code)
-    token_contract = SmartContract(compile_result.bytecode, compile_result.abi)
+    token_contract = SmartContract(compile_result.bytecode, compile_result.abi, trace_calls=True)
 
     # Alice部署代币合约
     token_address = vm.deploy_contract(token_contract, [1000000], alice.address)
@@ -405,8 +747,13 @@ def main():
         # 运行各个演示
         demo_basic_smart_contract()
         demo_contract_manager()
+        demo_contract_batch_operations()
         demo_account_management()
         demo_blockchain_operations()
+        demo_transaction_validation()
+        demo_transaction_pool()
+        demo_chain_queries()
+        demo_vm_simulation()
         demo_gas_calculation()
         demo_complete_dapp()
 
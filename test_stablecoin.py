@@ -157,6 +157,92 @@ def test_edge_cases():
     assert success == False  # 应该失败
     print("无效操作检查通过")
 
+    # 4. 测试超出抵押品精度的数量
+    print("\n4. 测试超出抵押品精度的数量")
+    manager = system.collateral_manager
+
+    # BTC 精度为8位小数，多出的位数应被拒绝而不是截断
+    success = manager.deposit_collateral("user_edge", "BTC", Decimal('1.000000019'))
+    assert success == False
+    assert manager.get_collateral_balance("user_edge", "BTC") is None
+    assert manager.get_total_supply("BTC") == Decimal('0')
+    assert all(event['collateral_type'] != "BTC"
+               for event in manager.get_events('collateral_deposit'))
+
+    success = manager.deposit_collateral("user_edge", "BTC", Decimal('2.00000001'))
+    assert success
+    assert manager.get_collateral_balance("user_edge", "BTC").amount == Decimal('2.00000001')
+    assert manager.quantize_amount("BTC", Decimal('0.123456789')) == Decimal('0.12345678')
+    print("精度检查通过")
+
+    # 5. 测试修改精度
+    print("\n5. 测试修改精度")
+    success = manager.update_collateral_type("BTC", decimals=2)
+    assert success == False
+    assert manager.get_collateral_type("BTC").decimals == 8
+    success = manager.update_collateral_type("USDC", decimals=2)
+    assert success == False
+    assert manager.get_collateral_type("USDC").decimals == 6
+
+    # 可更新字段正常生效
+    assert manager.update_collateral_type("USDC", name="USD Coin v2", stability_fee="0.01")
+    assert manager.get_collateral_type("USDC").name == "USD Coin v2"
+    assert manager.get_collateral_type("USDC").stability_fee == Decimal('0.01')
+
+    assert manager.deposit_collateral("user_edge", "BTC", Decimal('1'))
+    assert manager.get_collateral_balance("user_edge", "BTC").amount == Decimal('3.00000001')
+    assert manager.get_total_supply("BTC") == Decimal('3.00000001')
+    print("精度修改检查通过")
+
+    # 6. 测试活跃抵押品计数
+    print("\n6. 测试活跃抵押品计数")
+    active = manager.get_system_stats()['active_collaterals']
+    assert manager.update_collateral_type("USDC", is_active=False)
+    assert manager.get_system_stats()['active_collaterals'] == active - 1
+    # 重复停用不会重复计数
+    assert manager.update_collateral_type("USDC", is_active=False)
+    assert manager.get_system_stats()['active_collaterals'] == active - 1
+    assert manager.update_collateral_type("USDC", is_active=True)
+    assert manager.get_system_stats()['active_collaterals'] == active
+    print("活跃抵押品计数检查通过")
+
+    # 7. 测试批量操作
+    print("\n7. 测试批量操作")
+    results = manager.batch_apply([
+        ("deposit", "user_batch", "ETH", Decimal('5')),
+        ("lock", "user_batch", "ETH", Decimal('2')),
+        ("withdraw", "user_batch", "ETH", Decimal('4')),  # 可用余额只有3，应失败
+        ("unlock", "user_batch", "ETH", Decimal('1')),
+        ("transfer", "user_batch", "ETH", Decimal('1')),  # 未知操作
+        ("deposit", "user_batch", "BTC", Decimal('0.000000001')),  # 超出精度
+    ])
+    assert results == [True, True, False, True, False, False]
+    balance = manager.get_collateral_balance("user_batch", "ETH")
+    assert balance.amount == Decimal('5')
+    assert balance.locked_amount == Decimal('1')
+    assert manager.get_collateral_balance("user_batch", "BTC") is None
+    assert manager.balances["user_batch"] == {"ETH": balance}
+
+    # 事件日志按列存储，读取时组装；数量统一为按精度换算的 Decimal
+    assert manager.batch_apply([("deposit", "user_batch", "ETH", "1.5")]) == [True]
+    batch_events = [event for event in manager.events if event.get('user') == "user_batch"]
+    assert [event['type'] for event in batch_events] == [
+        'collateral_deposit', 'collateral_locked', 'collateral_unlocked', 'collateral_deposit']
+    assert [event['amount'] for event in batch_events] == [
+        Decimal('5'), Decimal('2'), Decimal('1'), Decimal('1.5')]
+    assert all(isinstance(event['amount'], Decimal) for event in batch_events)
+    assert [event['user'] for event in manager.get_events('collateral_locked')] == ["user_batch"]
+    print("批量操作检查通过")
+
+    # 8. 测试批量估值
+    print("\n8. 测试批量估值")
+    amounts = [Decimal('1'), Decimal('2.5'), Decimal('0.001')]
+    values = manager.calculate_collateral_values("ETH", amounts, Decimal('2000'))
+    assert values == [manager.calculate_collateral_value("ETH", amount, Decimal('2000'))
+                      for amount in amounts]
+    assert values == [Decimal('2000'), Decimal('5000'), Decimal('2')]
+    print("批量估值检查通过")
+
     print("边缘情况测试通过！")
 
 